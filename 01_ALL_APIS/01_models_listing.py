@@ -3,14 +3,18 @@ LLM Bootcamp OpenAI Demo - Models Listing
 GET /v1/models - List models and metadata
 """
 
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.client import get_client
 
 load_dotenv()
 
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+client = get_client(api_key)
 
 
 def list_models():
@@ -1,23 +1,34 @@
-from openai import OpenAI
 from dotenv import load_dotenv
+import argparse
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.client import get_client
+from llm_utils.metrics import StreamTimer, default_registry
+from llm_utils.streaming import TerminalSink, consume_stream
 
 # Load environment variables from .env file
 load_dotenv()
 my_key = os.environ.get("OPENAI_API_KEY")
 
 # Initialize OpenAI client
-client = OpenAI(api_key=my_key)
+client = get_client(my_key)
 
 
 def stream_text_completion(
-    prompt, model="gpt-4o-mini", max_tokens=1024, temperature=0.7
+    prompt, model="gpt-4o-mini", max_tokens=1024, temperature=0.7, echo=True, **labels
 ):
     """
     Stream text completion response from OpenAI API
+
+    Connect time, time-to-first-token and inter-token gaps are recorded in
+    the metrics registry under `labels`; echo=False skips printing.
     """
     try:
-        # Create streaming completion
+        # Create streaming completion, timing from the request onwards
+        timer = StreamTimer(path="stream_text_completion", **labels)
         stream = client.chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": prompt}],
@@ -25,18 +36,15 @@ def stream_text_completion(
             temperature=temperature,
             stream=True,  # Enable streaming
         )
+        timer.connected()
 
-        # Initialize response collector
-        full_response = ""
+        if not echo:
+            return consume_stream(stream, [timer])
 
         print("Assistant: ", end="", flush=True)
 
-        # Process streaming chunks
-        for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                content = chunk.choices[0].delta.content
-                print(content, end="", flush=True)
-                full_response += content
+        # Process streaming chunks, coalescing terminal writes
+        full_response = consume_stream(stream, [TerminalSink(), timer])
 
         print()  # Newline after completion
         return full_response
@@ -97,35 +105,85 @@ def interactive_chat():
             print("Please try again or type 'exit' to quit.")
 
 
-def demo_streaming():
+def demo_streaming(bench=None):
     """
     Demo function showing different streaming examples
+
+    With bench=N each prompt runs N times without echo, then the latency
+    percentiles are printed.
     """
-    print("Streaming Demo Examples")
+    examples = [
+        (
+            "Creative Writing",
+            "Write a short story about a robot learning to paint",
+            0.8,
+        ),
+        (
+            "Code Explanation",
+            "Explain what this Python code does: def fibonacci(n): return n if n <= 1 else fibonacci(n-1) + fibonacci(n-2)",
+            0.3,
+        ),
+        (
+            "Math Problem",
+            "Solve this math problem step by step: If a train travels 120 km in 2 hours, what is its speed in km/h?",
+            0.1,
+        ),
+    ]
+
+    if bench is None:
+        print("Streaming Demo Examples")
+        print("=" * 40)
+        for i, (title, prompt, temperature) in enumerate(examples, 1):
+            print(f"\nExample {i}: {title}")
+            stream_text_completion(prompt, temperature=temperature)
+        return
+
+    print(f"Streaming Benchmark ({bench} runs per prompt)")
     print("=" * 40)
-
-    # Example 1: Creative writing
-    print("\nExample 1: Creative Writing")
-    prompt1 = "Write a short story about a robot learning to paint"
-    stream_text_completion(prompt1, temperature=0.8)
-
-    # Example 2: Code explanation
-    print("\nExample 2: Code Explanation")
-    prompt2 = "Explain what this Python code does: def fibonacci(n): return n if n <= 1 else fibonacci(n-1) + fibonacci(n-2)"
-    stream_text_completion(prompt2, temperature=0.3)
-
-    # Example 3: Math problem
-    print("\nExample 3: Math Problem")
-    prompt3 = "Solve this math problem step by step: If a train travels 120 km in 2 hours, what is its speed in km/h?"
-    stream_text_completion(prompt3, temperature=0.1)
+    for i, (title, prompt, temperature) in enumerate(examples, 1):
+        for _ in range(bench):
+            stream_text_completion(
+                prompt, temperature=temperature, echo=False, example=str(i)
+            )
+
+        labels = {"path": "stream_text_completion", "example": str(i)}
+        print(f"\nExample {i}: {title}")
+        for name, unit in (
+            ("llm_stream_connect_seconds", "s"),
+            ("llm_stream_ttft_seconds", "s"),
+            ("llm_stream_inter_token_seconds", "s"),
+            ("llm_stream_total_seconds", "s"),
+            ("llm_stream_tokens_per_second", " tok/s"),
+        ):
+            histogram = default_registry.histogram(name, **labels)
+            print(
+                f"  {name[len('llm_stream_'):]:<22} "
+                f"p50 {histogram.percentile(50):.3f}{unit} | "
+                f"p95 {histogram.percentile(95):.3f}{unit} | "
+                f"p99 {histogram.percentile(99):.3f}{unit}"
+            )
 
 
 if __name__ == "__main__":
-    import sys
-
-    # Check if demo mode is requested
-    if len(sys.argv) > 1 and sys.argv[1] == "--demo":
-        demo_streaming()
+    parser = argparse.ArgumentParser(description="OpenAI text streaming demo")
+    parser.add_argument("--demo", action="store_true", help="Run the demo examples")
+    parser.add_argument(
+        "--bench", type=int, metavar="N", help="Run each demo prompt N times"
+    )
+    parser.add_argument(
+        "--metrics",
+        choices=["json", "prometheus"],
+        help="Print the collected metrics in this format on exit",
+    )
+    args = parser.parse_args()
+
+    if args.demo or args.bench:
+        demo_streaming(args.bench)
     else:
         # Start interactive chat
         interactive_chat()
+
+    if args.metrics == "json":
+        print(default_registry.to_json())
+    elif args.metrics == "prometheus":
+        print(default_registry.to_prometheus(), end="")
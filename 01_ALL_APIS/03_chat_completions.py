@@ -3,30 +3,96 @@ LLM Bootcamp OpenAI Demo - Chat Completions
 POST /v1/chat/completions - Chat-style completion (multi-turn)
 """
 
-from openai import OpenAI
+import asyncio
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.chat_cache import (
+    ResponseCache,
+    SQLiteResponseStore,
+    create_chat_completion,
+)
+from llm_utils.chat_runner import ChatRunner
+from llm_utils.client import (
+    aclose_async_clients,
+    client_stats,
+    get_async_client,
+    get_client,
+)
+from llm_utils.hedging import HedgePolicy, hedged_stream
+from llm_utils.metrics import StreamTimer
+from llm_utils.streaming import TerminalSink, consume_stream
+
 load_dotenv()
 
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+client = get_client(api_key)
+
+# Repeated deterministic requests are answered from memory (and disk, if set)
+response_cache_path = os.getenv("RESPONSE_CACHE_PATH")
+response_cache = ResponseCache(
+    max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+    disk=SQLiteResponseStore(response_cache_path) if response_cache_path else None,
+    allow_nondeterministic=os.getenv("RESPONSE_CACHE_ALLOW_NONDETERMINISTIC") == "1",
+)
+
+# Opt-in hedging: duplicate requests slower than the observed p95 (CHAT_HEDGING=1).
+# Each kind of call has its own policy, since their latencies are not comparable:
+# full responses (sync and async) versus time to the first streamed chunk.
+hedge_policies = {}
+if os.getenv("CHAT_HEDGING") == "1":
+    for kind in ("completion", "async_completion", "stream"):
+        hedge_policies[kind] = HedgePolicy(
+            percentile=float(os.getenv("CHAT_HEDGE_PERCENTILE", "95")),
+            max_hedge_ratio=float(os.getenv("CHAT_HEDGE_MAX_RATIO", "0.05")),
+        )
 
 
-def basic_chat(message, model="gpt-3.5-turbo"):
+def print_response_cache_stats():
+    """Print chat response cache hit/miss counters"""
+    stats = response_cache.stats()
+    print(
+        f"Response cache: {stats['memory_hits']} memory + {stats['disk_hits']} disk "
+        f"hits, {stats['misses']} misses (hit rate {stats['hit_rate']:.1%}), "
+        f"{stats['bypassed']} bypassed"
+    )
+
+
+def print_hedge_stats():
+    """Print hedged request counters for each kind of call"""
+    if not hedge_policies:
+        print("Hedging: disabled (set CHAT_HEDGING=1)")
+        return
+    for kind, policy in hedge_policies.items():
+        stats = policy.stats()
+        print(
+            f"Hedging ({kind}): {stats['hedges_issued']} issued, "
+            f"{stats['hedges_won']} won, {stats['hedges_denied']} over budget, "
+            f"of {stats['requests']} requests (delay {stats['delay']:.2f}s)"
+        )
+
+
+def basic_chat(message, model="gpt-3.5-turbo", temperature=0.7):
     """Basic chat completion"""
     try:
-        response = client.chat.completions.create(
+        response, cached = create_chat_completion(
+            client,
+            response_cache,
+            hedge_policies.get("completion"),
             model=model,
             messages=[{"role": "user", "content": message}],
             max_tokens=150,
-            temperature=0.7,
+            temperature=temperature,
         )
 
         print(f"=== Basic Chat ===")
         print(f"User: {message}")
         print(f"Assistant: {response.choices[0].message.content}")
-        print(f"Usage: {response.usage}")
+        print(f"Usage: {response.usage}" + (" (cached)" if cached else ""))
 
         return response
 
@@ -35,11 +101,17 @@ def basic_chat(message, model="gpt-3.5-turbo"):
         return None
 
 
-def multi_turn_conversation(messages, model="gpt-3.5-turbo"):
+def multi_turn_conversation(messages, model="gpt-3.5-turbo", temperature=0.7):
     """Multi-turn conversation"""
     try:
-        response = client.chat.completions.create(
-            model=model, messages=messages, max_tokens=200, temperature=0.7
+        response, cached = create_chat_completion(
+            client,
+            response_cache,
+            hedge_policies.get("completion"),
+            model=model,
+            messages=messages,
+            max_tokens=200,
+            temperature=temperature,
         )
 
         print(f"=== Multi-turn Conversation ===")
@@ -47,7 +119,7 @@ def multi_turn_conversation(messages, model="gpt-3.5-turbo"):
         for msg in messages:
             print(f"{msg['role'].title()}: {msg['content']}")
         print(f"Assistant: {response.choices[0].message.content}")
-        print(f"Usage: {response.usage}")
+        print(f"Usage: {response.usage}" + (" (cached)" if cached else ""))
 
         return response
 
@@ -56,24 +128,29 @@ def multi_turn_conversation(messages, model="gpt-3.5-turbo"):
         return None
 
 
-def system_prompt_chat(system_prompt, user_message, model="gpt-3.5-turbo"):
+def system_prompt_chat(
+    system_prompt, user_message, model="gpt-3.5-turbo", temperature=0.7
+):
     """Chat with system prompt to define behavior"""
     try:
-        response = client.chat.completions.create(
+        response, cached = create_chat_completion(
+            client,
+            response_cache,
+            hedge_policies.get("completion"),
             model=model,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message},
             ],
             max_tokens=200,
-            temperature=0.7,
+            temperature=temperature,
         )
 
         print(f"=== System Prompt Chat ===")
         print(f"System: {system_prompt}")
         print(f"User: {user_message}")
         print(f"Assistant: {response.choices[0].message.content}")
-        print(f"Usage: {response.usage}")
+        print(f"Usage: {response.usage}" + (" (cached)" if cached else ""))
 
         return response
 
@@ -89,20 +166,23 @@ def streaming_chat(message, model="gpt-3.5-turbo"):
         print(f"User: {message}")
         print("Assistant: ", end="", flush=True)
 
-        stream = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": message}],
-            max_tokens=200,
-            temperature=0.7,
-            stream=True,
-        )
+        timer = StreamTimer(path="streaming_chat")
 
-        full_response = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                content = chunk.choices[0].delta.content
-                print(content, end="", flush=True)
-                full_response += content
+        def create():
+            return client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": message}],
+                max_tokens=200,
+                temperature=0.7,
+                stream=True,
+            )
+
+        # With hedging, a slow first chunk triggers a duplicate stream
+        stream_policy = hedge_policies.get("stream")
+        stream = hedged_stream(stream_policy, create) if stream_policy else create()
+        timer.connected()
+
+        full_response = consume_stream(stream, [TerminalSink(), timer])
 
         print("\n" + "=" * 60)
 
@@ -113,6 +193,67 @@ def streaming_chat(message, model="gpt-3.5-turbo"):
         return None
 
 
+def concurrent_chats(conversations, model="gpt-3.5-turbo", max_concurrency=16):
+    """Run many conversations concurrently, printing each reply as it completes"""
+    try:
+
+        async def run():
+            # Each asyncio.run() gets its own pooled client, closed on exit
+            runner = ChatRunner(
+                get_async_client(api_key),
+                model=model,
+                max_concurrency=max_concurrency,
+                hedge=hedge_policies.get("async_completion"),
+                max_tokens=150,
+                temperature=0.7,
+            )
+            results = [None] * len(conversations)
+            try:
+                async for result in runner.run(conversations):
+                    results[result["index"]] = result
+                    if result["error"] is not None:
+                        print(f"[{result['index']}] Error: {result['error']}")
+                        continue
+                    reply = result["response"].choices[0].message.content
+                    print(
+                        f"[{result['index']}] {result['latency']:.2f}s | "
+                        f"{result['prompt_tokens']}+{result['completion_tokens']} "
+                        f"tokens | {reply[:60]!r}"
+                    )
+            finally:
+                await aclose_async_clients()
+            return runner, results
+
+        print(f"=== Concurrent Chats ===")
+        print(f"Conversations: {len(conversations)} | Concurrency: {max_concurrency}")
+        runner, results = asyncio.run(run())
+
+        stats = runner.stats()
+        print(
+            f"Requests: {stats['requests']} | Errors: {stats['errors']} | "
+            f"p50: {stats['latency_p50']:.2f}s | p95: {stats['latency_p95']:.2f}s"
+        )
+        print(
+            f"Tokens: {stats['prompt_tokens']} prompt + "
+            f"{stats['completion_tokens']} completion"
+        )
+        limits = client_stats()
+        if limits["adaptive"]:
+            print(
+                f"API concurrency limit: {limits['limit']} | "
+                f"Throttle events: {limits['throttle_events']} | "
+                f"Retries: {limits['retries']}"
+            )
+        else:
+            print("API concurrency: not adaptive (httpx is not installed)")
+
+        return results
+
+    except Exception as e:
+        print(f"Error in concurrent chats: {e}")
+        return None
+
+
 if __name__ == "__main__":
     # Basic chat
     basic_chat("Hello! How are you today?")
@@ -138,7 +279,28 @@ if __name__ == "__main__":
 
     print("\n" + "=" * 60 + "\n")
 
+    # Response cache: the repeated temperature-0 request never reaches the API
+    for _ in range(2):
+        basic_chat("What is the capital of France?", temperature=0)
+    print_response_cache_stats()
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Concurrent chats: results print in completion order, tagged by index
+    questions = [
+        "What is a list comprehension?",
+        "What is a decorator?",
+        "What is a generator?",
+        "What is a context manager?",
+    ]
+    concurrent_chats(
+        [[{"role": "user", "content": question}] for question in questions],
+        max_concurrency=2,
+    )
+
     print("\n" + "=" * 60 + "\n")
 
     # Streaming chat
     streaming_chat("Tell me a short story about artificial intelligence.")
+
+    print_hedge_stats()
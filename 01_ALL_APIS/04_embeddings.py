@@ -3,30 +3,115 @@ LLM Bootcamp OpenAI Demo - Embeddings
 POST /v1/embeddings - Generate vector embeddings
 """
 
-from openai import OpenAI
 import os
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from pathlib import Path
 from dotenv import load_dotenv
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.ann_index import IVFIndex
+from llm_utils.bm25 import BM25Index, reciprocal_rank_fusion
+from llm_utils.classifier import CentroidClassifier
+from llm_utils.client import get_client
+from llm_utils.clustering import MiniBatchKMeans, representatives
+from llm_utils.dedup import find_near_duplicates
+from llm_utils.document_index import DocumentIndex
+from llm_utils.embedding_batcher import BatchEmbedder
+from llm_utils.embedding_cache import EmbeddingCache, embed_with_cache
+from llm_utils.embedding_store import EmbeddingStore
+from llm_utils.migration import EmbeddingMigration, read_active
+from llm_utils.quantization import QuantizedIndex, evaluate_recall
+from llm_utils.reduction import Projection, evaluate_reduction, supports_dimensions
+from llm_utils.sharded_search import ShardedSearcher
+from llm_utils.similarity import (
+    SimilarityEngine,
+    mean_pairwise_similarity,
+    normalize_rows,
+)
 
 load_dotenv()
 
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+client = get_client(api_key)
+
+# Persistent cache so unchanged texts are never re-embedded
+embedding_cache = EmbeddingCache(
+    os.getenv("EMBEDDING_CACHE_PATH", Path(__file__).parent / "embedding_cache.sqlite"),
+    max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "1000000")),
+)
+
+# Splits large inputs into request-sized batches sent concurrently
+embedding_batcher = BatchEmbedder(
+    client, max_workers=int(os.getenv("EMBEDDING_MAX_WORKERS", "4"))
+)
+
+
+def embed_texts(texts, model, **create_kwargs):
+    """Embed texts through the cache and batcher; returns (matrix, usage)"""
+    return embed_with_cache(
+        client,
+        texts,
+        model,
+        embedding_cache,
+        batcher=embedding_batcher,
+        **create_kwargs,
+    )
+
+
+def print_cache_stats():
+    """Print embedding cache hit/miss counters"""
+    stats = embedding_cache.stats()
+    print(
+        f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+        f"(hit rate {stats['hit_rate']:.1%}), {stats['entries']} entries"
+    )
 
 
-def create_embeddings(texts, model="text-embedding-ada-002"):
-    """Create embeddings for a list of texts"""
+def print_throughput_stats():
+    """Print cumulative embedding throughput"""
+    stats = embedding_batcher.stats()
+    print(
+        f"Throughput: {stats['texts_per_s']:.1f} texts/s, "
+        f"{stats['tokens_per_s']:.1f} tokens/s over {stats['requests']} requests"
+    )
+
+
+def create_embeddings(
+    texts,
+    model="text-embedding-ada-002",
+    store=None,
+    ids=None,
+    encoding_format="base64",
+    dimensions=None,
+):
+    """Create embeddings for a list of texts as a float32 matrix"""
     try:
-        response = client.embeddings.create(model=model, input=texts)
+        create_kwargs = {"encoding_format": encoding_format}
+        if dimensions is not None:
+            if not supports_dimensions(model):
+                raise ValueError(
+                    f"{model} does not support `dimensions`; use reduce_store instead"
+                )
+            create_kwargs["dimensions"] = dimensions
+        matrix, usage = embed_texts(texts, model, **create_kwargs)
 
         print(f"=== Embeddings Created ===")
         print(f"Model: {model}")
+        print(f"Wire format: {encoding_format}")
         print(f"Number of texts: {len(texts)}")
-        print(f"Embedding dimensions: {len(response.data[0].embedding)}")
-        print(f"Usage: {response.usage}")
+        print(f"Embedding dimensions: {matrix.shape[1]}")
+        print(f"Usage: {usage}")
+        print_cache_stats()
+        print_throughput_stats()
+
+        if store is not None:
+            store.append(ids if ids is not None else texts, matrix)
+            print(f"Appended to store: {store.path} ({len(store)} rows)")
 
-        return [data.embedding for data in response.data]
+        return matrix
 
     except Exception as e:
         print(f"Error creating embeddings: {e}")
@@ -36,16 +121,18 @@ def create_embeddings(texts, model="text-embedding-ada-002"):
 def single_text_embedding(text, model="text-embedding-ada-002"):
     """Create embedding for a single text"""
     try:
-        response = client.embeddings.create(model=model, input=text)
+        matrix, usage = embed_texts([text], model)
+        embedding = matrix[0].tolist()
 
         print(f"=== Single Text Embedding ===")
         print(f"Text: {text}")
         print(f"Model: {model}")
-        print(f"Embedding dimensions: {len(response.data[0].embedding)}")
-        print(f"First 10 values: {response.data[0].embedding[:10]}")
-        print(f"Usage: {response.usage}")
+        print(f"Embedding dimensions: {len(embedding)}")
+        print(f"First 10 values: {embedding[:10]}")
+        print(f"Usage: {usage}")
+        print_cache_stats()
 
-        return response.data[0].embedding
+        return embedding
 
     except Exception as e:
         print(f"Error creating single embedding: {e}")
@@ -56,19 +143,18 @@ def semantic_similarity(text1, text2, model="text-embedding-ada-002"):
     """Calculate semantic similarity between two texts"""
     try:
         # Create embeddings for both texts
-        response = client.embeddings.create(model=model, input=[text1, text2])
-
-        embedding1 = response.data[0].embedding
-        embedding2 = response.data[1].embedding
+        matrix, usage = embed_texts([text1, text2], model)
 
         # Calculate cosine similarity
-        similarity = cosine_similarity([embedding1], [embedding2])[0][0]
+        normalized = normalize_rows(matrix)
+        similarity = float(normalized[0] @ normalized[1])
 
         print(f"=== Semantic Similarity ===")
         print(f"Text 1: {text1}")
         print(f"Text 2: {text2}")
         print(f"Similarity Score: {similarity:.4f}")
-        print(f"Usage: {response.usage}")
+        print(f"Usage: {usage}")
+        print_cache_stats()
 
         return similarity
 
@@ -110,27 +196,18 @@ def text_classification_example(model="text-embedding-ada-002"):
 
         embeddings = create_embeddings(all_texts, model)
 
-        if embeddings:
+        if embeddings is not None:
             print(f"\n=== Text Classification Example ===")
             print(f"Total texts: {len(all_texts)}")
             print(f"Categories: {list(categories.keys())}")
 
             # Calculate similarities within categories
+            labels = np.asarray(text_labels)
             for category in categories.keys():
-                category_indices = [
-                    i for i, label in enumerate(text_labels) if label == category
-                ]
-                category_embeddings = [embeddings[i] for i in category_indices]
+                category_embeddings = embeddings[labels == category]
 
                 if len(category_embeddings) > 1:
-                    avg_similarity = np.mean(
-                        [
-                            cosine_similarity([emb1], [emb2])[0][0]
-                            for i, emb1 in enumerate(category_embeddings)
-                            for j, emb2 in enumerate(category_embeddings)
-                            if i != j
-                        ]
-                    )
+                    avg_similarity = mean_pairwise_similarity(category_embeddings)
                     print(
                         f"Average similarity within '{category}': {avg_similarity:.4f}"
                     )
@@ -142,24 +219,60 @@ def text_classification_example(model="text-embedding-ada-002"):
         return None, None
 
 
-def search_example(query, documents, model="text-embedding-ada-002"):
+def build_classifier(
+    embeddings, labels, classifier_path="classifier", model="text-embedding-ada-002"
+):
+    """Fit and persist a nearest-centroid classifier from labelled embeddings"""
+    try:
+        classifier = CentroidClassifier.fit(embeddings, labels, model=model)
+        classifier.save(classifier_path)
+
+        print(f"=== Classifier Built ===")
+        print(f"Labels: {classifier.labels}")
+        print(f"Saved to: {classifier_path}")
+
+        return classifier
+
+    except Exception as e:
+        print(f"Error building classifier: {e}")
+        return None
+
+
+def classify_texts(texts, classifier_path="classifier"):
+    """Classify a batch of new texts locally against stored centroids"""
+    try:
+        classifier = CentroidClassifier.load(classifier_path)
+        matrix, usage = embed_texts(texts, classifier.model)
+        labels, scores = classifier.predict(matrix)
+
+        print(f"=== Text Classification ===")
+        for text, label, score in zip(texts, labels, scores):
+            print(f"{label} ({score:.4f}) | {text}")
+        print(f"Usage: {usage}")
+
+        return list(zip(labels, scores.tolist()))
+
+    except Exception as e:
+        print(f"Error classifying texts: {e}")
+        return None
+
+
+def search_example(query, documents, model="text-embedding-ada-002", top_k=None):
     """Example of semantic search using embeddings"""
     try:
         # Create embeddings for query and documents
         all_texts = [query] + documents
-        response = client.embeddings.create(model=model, input=all_texts)
-
-        query_embedding = response.data[0].embedding
-        document_embeddings = [data.embedding for data in response.data[1:]]
+        matrix, usage = embed_texts(all_texts, model)
 
-        # Calculate similarities
-        similarities = []
-        for i, doc_embedding in enumerate(document_embeddings):
-            similarity = cosine_similarity([query_embedding], [doc_embedding])[0][0]
-            similarities.append((similarity, documents[i]))
+        query_embedding = matrix[0]
+        document_embeddings = matrix[1:]
 
-        # Sort by similarity
-        similarities.sort(reverse=True)
+        # Score every document with one matmul and keep the top k
+        engine = SimilarityEngine(document_embeddings)
+        indices, scores = engine.search(query_embedding, k=top_k or len(documents))
+        similarities = [
+            (float(score), documents[i]) for i, score in zip(indices[0], scores[0])
+        ]
 
         print(f"=== Semantic Search Example ===")
         print(f"Query: {query}")
@@ -168,7 +281,8 @@ def search_example(query, documents, model="text-embedding-ada-002"):
         for i, (similarity, document) in enumerate(similarities, 1):
             print(f"{i}. Similarity: {similarity:.4f} | Document: {document}")
 
-        print(f"Usage: {response.usage}")
+        print(f"Usage: {usage}")
+        print_cache_stats()
 
         return similarities
 
@@ -177,6 +291,544 @@ def search_example(query, documents, model="text-embedding-ada-002"):
         return None
 
 
+def deduplicate_documents(
+    documents, threshold=0.95, model="text-embedding-ada-002", embeddings=None
+):
+    """Drop near-duplicate documents, keeping the first of each cluster"""
+    try:
+        if embeddings is None:
+            embeddings, _ = embed_texts(documents, model)
+        clusters, comparisons = find_near_duplicates(embeddings, threshold=threshold)
+        dropped = {row for cluster in clusters for row in cluster[1:]}
+        keep = [i for i in range(len(documents)) if i not in dropped]
+
+        print(f"=== Near-Duplicate Detection ===")
+        print(f"Documents: {len(documents)} | Threshold: {threshold}")
+        print(f"Exact comparisons: {comparisons}")
+        for cluster in clusters:
+            print(f"Cluster: {[documents[i] for i in cluster]}")
+        print(f"Kept {len(keep)} documents, dropped {len(dropped)}")
+
+        return keep, clusters
+
+    except Exception as e:
+        print(f"Error detecting near-duplicates: {e}")
+        return None, None
+
+
+def build_search_index(
+    documents,
+    index_path="search_index",
+    model="text-embedding-ada-002",
+    nprobe=8,
+    dedup_threshold=None,
+):
+    """Embed documents once and persist an IVF index for repeated searches"""
+    try:
+        matrix, usage = embed_texts(documents, model)
+        if dedup_threshold is not None:
+            keep, _ = deduplicate_documents(
+                documents, dedup_threshold, model, embeddings=matrix
+            )
+            documents = [documents[i] for i in keep]
+            matrix = matrix[keep]
+        index = IVFIndex.build(matrix, nprobe=nprobe)
+
+        index_path = Path(index_path)
+        index.save(index_path)
+        (index_path / "documents.json").write_text(
+            json.dumps({"model": model, "documents": documents})
+        )
+
+        print(f"=== Search Index Built ===")
+        print(f"Documents: {len(index)} | Lists: {index.n_lists} | nprobe: {nprobe}")
+        print(f"Saved to: {index_path}")
+        print(f"Usage: {usage}")
+
+        return index
+
+    except Exception as e:
+        print(f"Error building search index: {e}")
+        return None
+
+
+def indexed_search(query, index_path="search_index", top_k=5, nprobe=None):
+    """Semantic search against a prebuilt index; only the query is embedded"""
+    try:
+        index_path = Path(index_path)
+        index = IVFIndex.load(index_path)
+        metadata = json.loads((index_path / "documents.json").read_text())
+        documents = metadata["documents"]
+
+        matrix, usage = embed_texts([query], metadata["model"])
+        ids, scores = index.search(matrix, k=top_k, nprobe=nprobe)
+        results = [
+            (float(score), documents[doc_id])
+            for doc_id, score in zip(ids[0], scores[0])
+            if doc_id >= 0
+        ]
+
+        print(f"=== Indexed Semantic Search ===")
+        print(f"Query: {query}")
+        print(f"Indexed documents: {len(index)} | nprobe: {nprobe or index.nprobe}")
+        print("\nSearch Results (sorted by relevance):")
+        for i, (similarity, document) in enumerate(results, 1):
+            print(f"{i}. Similarity: {similarity:.4f} | Document: {document}")
+
+        print(f"Usage: {usage}")
+
+        return results
+
+    except Exception as e:
+        print(f"Error in indexed search: {e}")
+        return None
+
+
+def store_search(
+    query, store_path="embedding_store", top_k=5, model="text-embedding-ada-002"
+):
+    """Exact semantic search over a memory-mapped embedding store"""
+    try:
+        store = EmbeddingStore(store_path)
+        matrix, usage = embed_texts([query], model)
+        ids, scores = store.search(matrix, k=top_k)
+        results = [(float(score), doc_id) for doc_id, score in zip(ids[0], scores[0])]
+
+        print(f"=== Store Semantic Search ===")
+        print(f"Query: {query}")
+        print(f"Stored embeddings: {len(store)} x {store.dim} ({store.dtype})")
+        print("\nSearch Results (sorted by relevance):")
+        for i, (similarity, document) in enumerate(results, 1):
+            print(f"{i}. Similarity: {similarity:.4f} | Document: {document}")
+
+        print(f"Usage: {usage}")
+
+        return results
+
+    except Exception as e:
+        print(f"Error in store search: {e}")
+        return None
+
+
+def quantized_search(
+    query,
+    store_path="embedding_store",
+    mode="int8",
+    top_k=5,
+    rerank=4,
+    model="text-embedding-ada-002",
+    report_recall=False,
+):
+    """Coarse search over int8/binary codes, re-ranked with full-precision vectors"""
+    try:
+        store = EmbeddingStore(store_path)
+        index = QuantizedIndex.load(store.path, mode)
+        if index is None or len(index) != len(store):
+            index = QuantizedIndex.build(store.vectors, mode)
+            index.save(store.path)
+
+        matrix, usage = embed_texts([query], model)
+        rows, scores = index.search(matrix, store.vectors, k=top_k, rerank=rerank)
+        ids = store.ids
+        results = [
+            (float(score), ids[row])
+            for row, score in zip(rows[0], scores[0])
+            if row >= 0
+        ]
+
+        full_bytes = len(store) * store.dim * 4
+        print(f"=== Quantized Semantic Search ({mode}) ===")
+        print(f"Query: {query}")
+        print(
+            f"Codes: {index.nbytes:,} bytes vs float32 {full_bytes:,} bytes "
+            f"({full_bytes / index.nbytes:.1f}x smaller) | "
+            f"rerank: {top_k * rerank} candidates"
+        )
+        if report_recall:
+            report = evaluate_recall(
+                index, store.vectors, matrix, k=top_k, rerank=rerank
+            )
+            print(
+                f"Recall@{top_k} vs exact search: {report['coarse_recall']:.3f} "
+                f"coarse, {report['reranked_recall']:.3f} re-ranked"
+            )
+        print("\nSearch Results (sorted by relevance):")
+        for i, (similarity, document) in enumerate(results, 1):
+            print(f"{i}. Similarity: {similarity:.4f} | Document: {document}")
+
+        print(f"Usage: {usage}")
+
+        return results
+
+    except Exception as e:
+        print(f"Error in quantized search: {e}")
+        return None
+
+
+def quantization_recall(
+    queries,
+    store_path="embedding_store",
+    top_k=5,
+    rerank=4,
+    model="text-embedding-ada-002",
+):
+    """Recall@k against exact search and compression for int8 and binary codes"""
+    try:
+        store = EmbeddingStore(store_path)
+        matrix, usage = embed_texts(queries, model)
+
+        print(f"=== Quantization Recall vs Compression ===")
+        print(f"Vectors: {len(store)} x {store.dim} | Queries: {len(queries)}")
+        reports = []
+        for mode in ("int8", "binary"):
+            index = QuantizedIndex.load(store.path, mode)
+            if index is None or len(index) != len(store):
+                index = QuantizedIndex.build(store.vectors, mode)
+                index.save(store.path)
+            report = evaluate_recall(
+                index, store.vectors, matrix, k=top_k, rerank=rerank
+            )
+            reports.append(report)
+            print(
+                f"{mode:>6}: {report['compression']:.1f}x smaller | "
+                f"Recall@{top_k} coarse {report['coarse_recall']:.3f}, "
+                f"re-ranked {report['reranked_recall']:.3f}"
+            )
+        print(f"Usage: {usage}")
+
+        return reports
+
+    except Exception as e:
+        print(f"Error evaluating quantization recall: {e}")
+        return None
+
+
+def hybrid_search(
+    query,
+    documents,
+    top_k=5,
+    mode="hybrid",
+    embedding_timeout=2.0,
+    model="text-embedding-ada-002",
+):
+    """
+    BM25 keyword search fused with vector search by reciprocal rank.
+
+    mode="keyword" never touches the network; in hybrid mode the keyword
+    ranking is returned on its own if embeddings take longer than
+    embedding_timeout seconds or fail.
+    """
+    try:
+        bm25 = BM25Index(documents)
+        keyword_ids, _ = bm25.search(query, k=top_k * 2)
+        rankings = [keyword_ids.tolist()]
+        used_mode = "keyword"
+        usage = None
+
+        if mode == "hybrid":
+            executor = ThreadPoolExecutor(max_workers=1)
+            future = executor.submit(embed_texts, [query] + documents, model)
+            try:
+                matrix, usage = future.result(timeout=embedding_timeout)
+                engine = SimilarityEngine(matrix[1:])
+                vector_ids, _ = engine.search(matrix[0], k=top_k * 2)
+                rankings.append(vector_ids[0].tolist())
+                used_mode = "hybrid"
+            except TimeoutError:
+                print(
+                    f"Embeddings slower than {embedding_timeout}s, using keywords only"
+                )
+            except Exception as e:
+                print(f"Embeddings failed ({e}), using keywords only")
+            finally:
+                executor.shutdown(wait=False)
+
+        results = [
+            (score, documents[doc_id])
+            for score, doc_id in reciprocal_rank_fusion(rankings)[:top_k]
+        ]
+
+        print(f"=== Hybrid Search ({used_mode}) ===")
+        print(f"Query: {query}")
+        print("\nSearch Results (sorted by fused rank):")
+        for i, (score, document) in enumerate(results, 1):
+            print(f"{i}. RRF score: {score:.4f} | Document: {document}")
+
+        print(f"Usage: {usage}")
+
+        return results
+
+    except Exception as e:
+        print(f"Error in hybrid search: {e}")
+        return None
+
+
+def cluster_store(store_path="embedding_store", n_clusters=8, per_cluster=3, **kwargs):
+    """Discover topics in a stored corpus with streaming mini-batch k-means"""
+    try:
+        store = EmbeddingStore(store_path)
+        kmeans = MiniBatchKMeans(n_clusters, **kwargs).fit(store.vectors)
+        labels, scores = kmeans.assign(store.vectors)
+        examples = representatives(labels, scores, n_clusters, per_cluster)
+
+        np.save(store.path / "cluster_centroids.npy", kmeans.centroids)
+        np.save(store.path / "cluster_labels.npy", labels)
+
+        print(f"=== Topic Clustering ===")
+        print(f"Vectors: {len(store)} | Clusters: {n_clusters}")
+        sizes = np.bincount(labels, minlength=n_clusters)
+        ids = store.ids
+        for cluster in range(n_clusters):
+            print(f"\nCluster {cluster} ({sizes[cluster]} documents):")
+            for row in examples[cluster]:
+                print(f"  - {ids[row]}")
+
+        return labels, kmeans.centroids, examples
+
+    except Exception as e:
+        print(f"Error clustering embeddings: {e}")
+        return None, None, None
+
+
+def sharded_search(
+    queries,
+    store_path="embedding_store",
+    top_k=5,
+    n_workers=None,
+    model="text-embedding-ada-002",
+):
+    """Exact search for a batch of queries, with the store sharded across processes"""
+    try:
+        matrix, usage = embed_texts(queries, model)
+        with ShardedSearcher(store_path, n_workers=n_workers) as searcher:
+            ids, scores = searcher.search(matrix, k=top_k)
+
+            print(f"=== Sharded Exact Search ===")
+            print(
+                f"Stored embeddings: {len(searcher.store)} | "
+                f"Shards: {len(searcher.shards)} | Workers: {searcher.n_workers}"
+            )
+
+        results = []
+        for query, query_ids, query_scores in zip(queries, ids, scores):
+            matches = [
+                (float(score), doc_id) for doc_id, score in zip(query_ids, query_scores)
+            ]
+            results.append(matches)
+            print(f"\nQuery: {query}")
+            for i, (similarity, document) in enumerate(matches, 1):
+                print(f"{i}. Similarity: {similarity:.4f} | Document: {document}")
+
+        print(f"Usage: {usage}")
+
+        return results
+
+    except Exception as e:
+        print(f"Error in sharded search: {e}")
+        return None
+
+
+def reduce_store(
+    store_path="embedding_store",
+    reduced_path="embedding_store_reduced",
+    n_components=256,
+    model="text-embedding-ada-002",
+):
+    """Write a reduced-dimension copy of a store plus its persisted projection"""
+    try:
+        store = EmbeddingStore(store_path)
+        projection = Projection.for_model(model, store.vectors, n_components)
+
+        reduced = EmbeddingStore(reduced_path, dtype=store.dtype)
+        if len(reduced):
+            raise ValueError(f"{reduced_path} already contains embeddings")
+        projection.save(reduced.path)
+        ids = store.ids
+        row = 0
+        for chunk in projection.transform_chunks(store.vectors):
+            reduced.append(ids[row : row + len(chunk)], chunk)
+            row += len(chunk)
+
+        print(f"=== Reduced Embedding Store ({projection.kind}) ===")
+        print(f"Dimensions: {store.dim} -> {reduced.dim}")
+        print(f"Saved to: {reduced.path}")
+
+        return reduced
+
+    except Exception as e:
+        print(f"Error reducing store: {e}")
+        return None
+
+
+def evaluate_dimension_reduction(
+    queries,
+    store_path="embedding_store",
+    reduced_path="embedding_store_reduced",
+    top_k=10,
+    model="text-embedding-ada-002",
+):
+    """Recall@k lost by searching the reduced store instead of the full one"""
+    try:
+        store = EmbeddingStore(store_path)
+        reduced = EmbeddingStore(reduced_path)
+        projection = Projection.load(reduced.path)
+        matrix, usage = embed_texts(queries, model)
+        report = evaluate_reduction(
+            store.vectors, reduced.vectors, matrix, projection, k=top_k
+        )
+
+        print(f"=== Dimension Reduction Evaluation ===")
+        print(f"Projection: {report['kind']} ({report['dimensions']})")
+        print(f"Queries: {len(queries)} | Recall@{top_k}: {report['recall']:.3f}")
+        print(f"Storage and scan cost: {report['size_ratio']:.1%} of full dimension")
+        print(f"Usage: {usage}")
+
+        return report
+
+    except Exception as e:
+        print(f"Error evaluating dimension reduction: {e}")
+        return None
+
+
+# Document indexes stay open, so their background compactor gets to run
+document_indexes = {}
+
+
+def open_document_index(index_path="document_index", model="text-embedding-ada-002"):
+    """
+    Persistent document index that embeds through the cache and batcher.
+
+    After a model migration the index and model recorded in active.json win.
+    Each index is opened once per process and compacted by a background
+    thread (every DOCUMENT_INDEX_COMPACT_INTERVAL seconds, default 60) once
+    tombstones make up 20% of its rows. Compaction copies rows without the
+    index lock; searches and writes only block for the final remap and swap.
+    """
+    path, active_model = read_active(index_path)
+    model = active_model or model
+    key = Path(path).resolve()
+    if key not in document_indexes:
+        index = DocumentIndex(path, embed=lambda texts: embed_texts(texts, model)[0])
+        index.start_background_compaction(
+            interval=float(os.getenv("DOCUMENT_INDEX_COMPACT_INTERVAL", "60")),
+            min_tombstone_ratio=0.2,
+        )
+        document_indexes[key] = index
+    return document_indexes[key], model
+
+
+def close_document_indexes():
+    """Stop the background compactors and close every open document index"""
+    for index in document_indexes.values():
+        index.close()
+    document_indexes.clear()
+
+
+def sync_document_index(
+    documents, index_path="document_index", model="text-embedding-ada-002"
+):
+    """Bring the index in line with {doc_id: text}, embedding only what changed"""
+    try:
+        index, model = open_document_index(index_path, model)
+        counts = index.sync(documents)
+
+        print(f"=== Document Index Sync ===")
+        print(
+            f"Embedded: {counts['embedded']} | Unchanged: {counts['unchanged']} | "
+            f"Deleted: {counts['deleted']}"
+        )
+        print(
+            f"Live documents: {len(index)} | Tombstones: {index.tombstones} "
+            f"(compacted in the background)"
+        )
+
+        return counts
+
+    except Exception as e:
+        print(f"Error syncing document index: {e}")
+        return None
+
+
+def document_search(
+    query, index_path="document_index", top_k=5, model="text-embedding-ada-002"
+):
+    """Semantic search over the live documents of a persistent document index"""
+    try:
+        index, model = open_document_index(index_path, model)
+        matrix, usage = embed_texts([query], model)
+        results = index.search(matrix, k=top_k)
+
+        print(f"=== Document Index Search ===")
+        print(f"Query: {query} | Model: {model}")
+        print("\nSearch Results (sorted by relevance):")
+        for i, (doc_id, text, similarity) in enumerate(results, 1):
+            print(f"{i}. Similarity: {similarity:.4f} | [{doc_id}] {text}")
+
+        print(f"Usage: {usage}")
+
+        return results
+
+    except Exception as e:
+        print(f"Error in document search: {e}")
+        return None
+
+
+def migrate_document_index(
+    new_model,
+    index_path="document_index",
+    batch_size=256,
+    requests_per_minute=60,
+    background=False,
+):
+    """
+    Re-embed a document index with `new_model` into a shadow index.
+
+    The current index keeps answering document_search until the shadow covers
+    every document; readers then switch over atomically. Interrupted runs
+    resume from the checkpoint. With background=True the migration object is
+    returned while it runs; call .stop() to pause it or .close() to also
+    release the shadow index.
+    """
+    try:
+        source, model = open_document_index(index_path)
+        if model == new_model:
+            print(f"Document index already uses {new_model}")
+            return None
+
+        migration = EmbeddingMigration(
+            index_path,
+            source,
+            new_model,
+            embed=lambda texts: embed_texts(texts, new_model)[0],
+            batch_size=batch_size,
+            requests_per_minute=requests_per_minute,
+        )
+
+        print(f"=== Embedding Model Migration ===")
+        print(f"From: {model} | To: {new_model} | Documents: {len(source)}")
+        if background:
+            migration.start()
+            return migration
+
+        # The shadow is closed after the switch; the next open_document_index
+        # call opens it by path as the one live handle
+        try:
+            migration.run()
+        finally:
+            migration.close()
+        stats = migration.stats()
+        print(
+            f"Copied: {stats['copied']} | Coverage: {stats['coverage']:.1%} | "
+            f"Switched: {stats['switched']}"
+        )
+
+        return stats
+
+    except Exception as e:
+        print(f"Error migrating document index: {e}")
+        return None
+
+
 if __name__ == "__main__":
     # Single text embedding
     single_text_embedding("Hello, world! This is a test of the embedding API.")
@@ -203,7 +855,22 @@ if __name__ == "__main__":
     print("\n" + "=" * 60 + "\n")
 
     # Text classification example
-    text_classification_example()
+    labelled_embeddings, labels = text_classification_example()
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Nearest-centroid classifier: fit once, then classify new texts locally
+    classifier_path = Path(__file__).parent / "classifier"
+    if labelled_embeddings is not None:
+        build_classifier(labelled_embeddings, labels, classifier_path)
+        classify_texts(
+            [
+                "Neural networks power modern voice assistants",
+                "The striker scored twice in the final",
+                "Grandma's lasagna recipe uses three cheeses",
+            ],
+            classifier_path,
+        )
 
     print("\n" + "=" * 60 + "\n")
 
@@ -217,3 +884,71 @@ if __name__ == "__main__":
         "AI systems can learn from data without explicit programming.",
     ]
     search_example(query, documents)
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Indexed search: embed the documents once, then only embed queries
+    index_path = Path(__file__).parent / "search_index"
+    build_search_index(
+        documents + [documents[0].upper()], index_path, dedup_threshold=0.95
+    )
+    indexed_search(query, index_path, top_k=3)
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Memory-mapped store: append once, then search without loading into RAM
+    store_path = Path(__file__).parent / "embedding_store"
+    store = EmbeddingStore(store_path, dtype="float16")
+    if len(store) == 0:
+        create_embeddings(documents, store=store)
+    store_search(query, store_path, top_k=3)
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Quantized search: compact codes in RAM, exact re-ranking from the store
+    quantized_search(query, store_path, mode="binary", top_k=3, report_recall=True)
+    quantization_recall([query, "How do I cook pasta?"], store_path, top_k=3)
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Hybrid search: exact keyword matches plus semantic matches
+    hybrid_search("neural networks layers", documents, top_k=3)
+    hybrid_search("neural networks layers", documents, top_k=3, mode="keyword")
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Topic clustering over the memory-mapped store
+    cluster_store(store_path, n_clusters=2, per_cluster=2)
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Sharded exact search: each worker process scans its slice of the store
+    sharded_search([query, "How do I cook pasta?"], store_path, top_k=2, n_workers=2)
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Dimension reduction: PCA for ada vectors, `dimensions` for text-embedding-3
+    reduced_path = Path(__file__).parent / "embedding_store_reduced"
+    if not (reduced_path / "meta.json").exists():
+        reduce_store(store_path, reduced_path, n_components=4)
+    evaluate_dimension_reduction(
+        [query, "How do I cook pasta?"], store_path, reduced_path, top_k=3
+    )
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Incremental document index: only new or edited documents are embedded
+    document_index_path = Path(__file__).parent / "document_index"
+    corpus = {f"doc-{i}": document for i, document in enumerate(documents)}
+    sync_document_index(corpus, document_index_path)
+    corpus["doc-1"] = "The forecast says it will be sunny all week."
+    del corpus["doc-3"]
+    sync_document_index(corpus, document_index_path)
+    document_search(query, document_index_path, top_k=3)
+
+    print("\n" + "=" * 60 + "\n")
+
+    # Model migration: re-embed into a shadow index, then switch readers over
+    migrate_document_index("text-embedding-3-small", document_index_path, batch_size=2)
+    document_search(query, document_index_path, top_k=3)
+    close_document_indexes()
@@ -3,18 +3,21 @@ LLM Bootcamp OpenAI Demo - Image Generation
 POST /v1/images/generations - Create or tweak images
 """
 
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
 import requests
 from PIL import Image
 import io
 from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.client import get_client
 
 load_dotenv()
 
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+client = get_client(api_key)
 
 
 def generate_image(prompt, size="1024x1024", quality="standard", style="vivid"):
@@ -3,18 +3,21 @@ LLM Bootcamp OpenAI Demo - Audio Transcription
 POST /v1/audio/transcriptions - Transcribe audio to text
 """
 
-from openai import OpenAI
 import os
 import argparse
 from dotenv import load_dotenv
 import requests
 import tempfile
 from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.client import get_client
 
 load_dotenv()
 
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+client = get_client(api_key)
 
 
 def create_transcriptions_folder():
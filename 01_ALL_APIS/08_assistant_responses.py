@@ -3,18 +3,22 @@ LLM Bootcamp OpenAI Demo - Assistant Responses with Real APIs
 POST /v1/chat/completions - Tool-augmented chat with weather and calculator APIs
 """
 
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
 import json
 import requests
 import math
 import re
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.client import get_client
 
 load_dotenv()
 
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+client = get_client(api_key)
 
 
 def get_coordinates(location):
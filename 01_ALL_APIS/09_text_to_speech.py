@@ -1,9 +1,12 @@
 from pathlib import Path
-from openai import OpenAI
 import os
 import argparse
+import sys
 from dotenv import load_dotenv
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.client import get_client
+
 
 def create_speech_folder():
     """Create speech folder if it doesn't exist"""
@@ -17,7 +20,8 @@ def generate_speech(
 ):
     """Generate speech from text and save to file"""
     load_dotenv()
-    client = OpenAI()
+    # Shared client: repeated calls reuse its connection pool
+    client = get_client()
 
     # Create speech folder
     speech_folder = create_speech_folder()
@@ -1,21 +1,45 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
+import sys
+from pathlib import Path
 
-# Initialize chat history
-chat_history = []
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.chat_history import ChatHistory, openai_summarizer
+from llm_utils.client import get_client
+from llm_utils.embedding_batcher import response_to_matrix
+from llm_utils.semantic_cache import SemanticCache, depends_on_context
 
 # Load environment variables from .env file
 load_dotenv()
 my_key = os.environ.get("OPENAI_API_KEY")
 
 # Initialize OpenAI client
-client = OpenAI(api_key=my_key)
+client = get_client(my_key)
+
+# Initialize chat history: recent turns verbatim, older ones summarized
+chat_history = ChatHistory(
+    openai_summarizer(client),
+    max_tokens=int(os.environ.get("CHAT_HISTORY_MAX_TOKENS", "2000")),
+)
+
+
+# Embed texts for the semantic cache
+def embed(texts):
+    response = client.embeddings.create(model="text-embedding-3-small", input=texts)
+    return response_to_matrix(response)
+
+
+# Reuse answers to questions that were already asked in other words. The
+# threshold is untuned; a sample of hits is re-answered to measure precision.
+semantic_cache = SemanticCache(
+    embed,
+    threshold=float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    verify_rate=float(os.environ.get("SEMANTIC_CACHE_VERIFY_RATE", "0.1")),
+)
 
 
 # Function to send a message and maintain chat history
 def send_message(user_input):
-    global chat_history
     chat_history.append({"role": "user", "content": user_input})
 
     # Add system role message
@@ -24,21 +48,31 @@ def send_message(user_input):
         "content": "you are a helpful data scientist interview assistant.",
     }
 
-    # Combine messages for the API call
-    messages = [system_message] + chat_history
+    # Combine system prompt, running summary and recent turns for the API call
+    messages = chat_history.messages(system_message)
 
     # Call OpenAI API for chat completion
-    chat_completion = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=messages,
-        temperature=0.5,
-        max_tokens=1024,
-        top_p=1,
-        stream=False,
+    def complete():
+        chat_completion = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=messages,
+            temperature=0.5,
+            max_tokens=1024,
+            top_p=1,
+            stream=False,
+        )
+        return chat_completion.choices[0].message.content
+
+    # Similar questions under the same system prompt skip the API call.
+    # Follow-ups like "why?" depend on earlier turns, so they bypass the cache.
+    assistant_response, _ = semantic_cache.get_or_create(
+        user_input,
+        complete,
+        scope=system_message["content"],
+        cacheable=not depends_on_context(user_input),
     )
 
-    # Extract and append assistant's response to chat history
-    assistant_response = chat_completion.choices[0].message.content
+    # Append assistant's response to chat history
     chat_history.append({"role": "assistant", "content": assistant_response})
 
     return assistant_response
@@ -53,6 +87,23 @@ def chat_cli():
     while True:
         user_input = input("You: ")
         if user_input.lower() == "exit":
+            stats = chat_history.stats()
+            print(
+                f"Prompt tokens: {stats['prompt_tokens']} "
+                f"(saved {stats['tokens_saved']} by summarizing "
+                f"{stats['summarized_turns']} turns)"
+            )
+            cache = semantic_cache.stats()
+            precision = cache["hit_precision"]
+            print(
+                f"Semantic cache: hit rate {cache['hit_rate']:.1%} "
+                f"({cache['bypassed']} follow-ups bypassed), precision "
+                + (
+                    f"{precision:.1%} of {cache['verified_hits']} verified hits"
+                    if precision is not None
+                    else "not measured yet"
+                )
+            )
             print("Exiting the chat. Goodbye!")
             break
 
@@ -1,21 +1,30 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
+import sys
+from pathlib import Path
 
-# Initialize chat history
-chat_history = []
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.chat_history import ChatHistory, openai_summarizer
+from llm_utils.client import get_client
+from llm_utils.metrics import StreamTimer, default_registry
+from llm_utils.streaming import TerminalSink, consume_stream
 
 # Load environment variables from .env file
 load_dotenv()
 my_key = os.environ.get("OPENAI_API_KEY")
 
 # Initialize OpenAI client
-client = OpenAI(api_key=my_key)
+client = get_client(my_key)
+
+# Initialize chat history: recent turns verbatim, older ones summarized
+chat_history = ChatHistory(
+    openai_summarizer(client),
+    max_tokens=int(os.environ.get("CHAT_HISTORY_MAX_TOKENS", "2000")),
+)
 
 
 # Function to send a message and maintain chat history
 def send_message(user_input):
-    global chat_history
     chat_history.append({"role": "user", "content": user_input})
 
     # Add system role message
@@ -24,10 +33,11 @@ def send_message(user_input):
         "content": "You are a helpful data scientist interview assistant.",
     }
 
-    # Combine messages for the API call
-    messages = [system_message] + chat_history
+    # Combine system prompt, running summary and recent turns for the API call
+    messages = chat_history.messages(system_message)
 
-    # Call OpenAI API with streaming enabled
+    # Call OpenAI API with streaming enabled, timing the request
+    timer = StreamTimer(path="send_message")
     chat_completion = client.chat.completions.create(
         model="gpt-4o-mini",
         messages=messages,
@@ -37,15 +47,10 @@ def send_message(user_input):
         stream=True,  # Enable streaming
     )
 
-    # Initialize an empty string to collect the assistant's response
-    assistant_response = ""
+    timer.connected()
 
-    # Stream and process the response chunks
-    for chunk in chat_completion:
-        if chunk.choices and chunk.choices[0].delta.content:
-            content = chunk.choices[0].delta.content
-            print(content, end="", flush=True)  # Print streamed content in real-time
-            assistant_response += content
+    # Stream the response chunks, printing them in coalesced writes
+    assistant_response = consume_stream(chat_completion, [TerminalSink(), timer])
 
     print()  # Newline after streaming completes
 
@@ -64,6 +69,19 @@ def chat_cli():
     while True:
         user_input = input("You: ")
         if user_input.lower() == "exit":
+            stats = chat_history.stats()
+            print(
+                f"Prompt tokens: {stats['prompt_tokens']} "
+                f"(saved {stats['tokens_saved']} by summarizing "
+                f"{stats['summarized_turns']} turns)"
+            )
+            ttft = default_registry.histogram(
+                "llm_stream_ttft_seconds", path="send_message"
+            )
+            print(
+                f"Time to first token: p50 {ttft.percentile(50):.2f}s, "
+                f"p95 {ttft.percentile(95):.2f}s over {ttft.count} replies"
+            )
             print("Exiting the chat. Goodbye!")
             break
 
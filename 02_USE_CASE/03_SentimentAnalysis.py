@@ -1,15 +1,19 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from enum import Enum
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.client import get_client
 
 # Load environment variables from .env file
 load_dotenv()
 my_key = os.environ.get("OPENAI_API_KEY")
 
 # Initialize OpenAI client
-client = OpenAI(api_key=my_key)
+client = get_client(my_key)
 
 
 class SentimentType(str, Enum):
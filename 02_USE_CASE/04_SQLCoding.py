@@ -1,16 +1,20 @@
-from openai import OpenAI
 import pandas as pd
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 import os
 import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.client import get_client
 
 # Load environment variables from .env file
 load_dotenv()
 my_key = os.environ.get("OPENAI_API_KEY")
 
 # Initialize OpenAI client
-client = OpenAI(api_key=my_key)
+client = get_client(my_key)
 
 # Create a SQL database connection (SQLite for this example)
 engine = create_engine("sqlite:///example.db")
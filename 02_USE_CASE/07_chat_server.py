@@ -0,0 +1,182 @@
+from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.chat_history import ChatHistory, openai_summarizer
+from llm_utils.chat_server import ChatServer, SessionStore
+from llm_utils.client import (
+    aclose_async_clients,
+    client_stats,
+    get_async_client,
+    get_client,
+)
+from llm_utils.mock_openai import MockOpenAI
+
+# Load environment variables from .env file
+load_dotenv()
+my_key = os.environ.get("OPENAI_API_KEY")
+
+# System role message shared by every session
+system_message = {
+    "role": "system",
+    "content": "You are a helpful data scientist interview assistant.",
+}
+
+
+# Build the per-session send_message around an async client
+def make_send_message(async_client):
+    async def send_message(history, user_input):
+        history.append({"role": "user", "content": user_input})
+
+        # Combine system prompt, running summary and recent turns for the API call
+        stream = await async_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=history.messages(system_message),
+            temperature=0.5,
+            max_tokens=1024,
+            top_p=1,
+            stream=True,
+        )
+
+        # Forward each delta to the caller while collecting the full reply
+        parts = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                content = chunk.choices[0].delta.content
+                parts.append(content)
+                yield content
+
+        # Append assistant's response to this session's history
+        history.append({"role": "assistant", "content": "".join(parts)})
+
+    return send_message
+
+
+# Send one message to the server and read the SSE reply
+async def post_message(host, port, session_id, message):
+    reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps({"message": message}).encode("utf-8")
+    writer.write(
+        (
+            f"POST /sessions/{session_id}/messages HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            "Accept: text/event-stream\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode("latin-1")
+        + body
+    )
+    await writer.drain()
+
+    start = time.perf_counter()
+    first_delta = None
+    reply = []
+    event = None
+    async for line in reader:
+        line = line.decode("utf-8").strip()
+        if line.startswith("event:"):
+            event = line.split(":", 1)[1].strip()
+        elif line.startswith("data:"):
+            data = json.loads(line.split(":", 1)[1])
+            if event == "error":
+                raise RuntimeError(data["error"])
+            if "delta" in data:
+                first_delta = first_delta or time.perf_counter() - start
+                reply.append(data["delta"])
+            event = None
+    writer.close()
+    return "".join(reply), first_delta, time.perf_counter() - start
+
+
+# Many concurrent sessions, each sending several turns
+async def load_test(host, port, sessions, turns):
+    latencies = []
+    first_deltas = []
+
+    async def run_session(i):
+        for turn in range(turns):
+            _, first_delta, latency = await post_message(
+                host, port, f"session-{i}", f"Question {turn} from session {i}"
+            )
+            first_deltas.append(first_delta or latency)
+            latencies.append(latency)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_session(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    first_deltas.sort()
+    print(f"=== Load Test ===")
+    print(f"Sessions: {sessions} | Turns each: {turns} | Time: {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} turns/s")
+    print(
+        f"First delta p50: {first_deltas[len(first_deltas) // 2]:.3f}s | "
+        f"Reply p50: {latencies[len(latencies) // 2]:.3f}s | "
+        f"p95: {latencies[int(len(latencies) * 0.95)]:.3f}s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Multi-session chat server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-hot", type=int, default=1000)
+    parser.add_argument("--sessions-db", default="chat_sessions.sqlite")
+    parser.add_argument(
+        "--mock", action="store_true", help="Answer from a local mock OpenAI endpoint"
+    )
+    parser.add_argument(
+        "--load-test", type=int, metavar="SESSIONS", help="Run a load test and exit"
+    )
+    parser.add_argument("--turns", type=int, default=3)
+    args = parser.parse_args()
+
+    # Optionally start the mock endpoint and point both clients at it
+    base_url = None
+    mock = None
+    if args.mock:
+        mock = MockOpenAI(port=0)
+        await mock.start()
+        base_url = mock.base_url
+    api_key = "mock" if args.mock else my_key
+    async_client = get_async_client(api_key, base_url)
+    client = get_client(api_key, base_url)
+
+    # One summarizer thread shared by every session's history
+    summarize = openai_summarizer(client)
+    executor = ThreadPoolExecutor(max_workers=1)
+    sessions = SessionStore(
+        args.sessions_db,
+        lambda: ChatHistory(summarize, executor=executor),
+        max_hot=args.max_hot,
+    )
+    server = ChatServer(make_send_message(async_client), sessions, args.host, args.port)
+    await server.start()
+    print(f"Chat server listening on http://{args.host}:{server.port}")
+
+    try:
+        if args.load_test:
+            await load_test(args.host, server.port, args.load_test, args.turns)
+            print(f"Sessions: {sessions.stats()}")
+            print(f"API client: {client_stats()}")
+        else:
+            await server.serve_forever()
+    finally:
+        await server.close()
+        await aclose_async_clients()
+        executor.shutdown()
+        if mock is not None:
+            await mock.close()
+
+
+# Run the server if this script is run directly
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,7 +3,12 @@ import os
 from dotenv import load_dotenv
 # Define the tools the agent can use
 import re
-from agents import Agent, Runner
+import sys
+from pathlib import Path
+from agents import Agent, Runner, set_default_openai_client
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from llm_utils.client import get_async_client
 
 # Load environment variables from a .env file
 load_dotenv()
@@ -11,6 +16,9 @@ load_dotenv()
 # Retrieve the OpenAI API key from the environment
 my_api_key = os.getenv("OPENAI_API_KEY")
 
+# Route agent calls through the shared, rate-limited client
+set_default_openai_client(get_async_client(my_api_key))
+
 agent = Agent(name="Assistant", instructions="You are a helpful assistant")
 
 result = Runner.run_sync(agent, "Write latest financial report for my trading of Tesla stock")
@@ -0,0 +1,4 @@
+"""
+LLM Bootcamp OpenAI Demo - Shared utilities
+Helpers reused by the scripts in 01_ALL_APIS and 02_USE_CASE
+"""
@@ -0,0 +1,211 @@
+"""
+LLM Bootcamp OpenAI Demo - Approximate Nearest Neighbour Index
+IVF (inverted file) index over normalized embeddings, persisted as .npy files
+
+Run directly for a recall-vs-brute-force benchmark on synthetic data:
+    python -m llm_utils.ann_index --vectors 200000 --dim 256
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from llm_utils.similarity import SimilarityEngine, normalize_rows, top_k_indices
+
+
+def assign_to_centroids(vectors, centroids, chunk_size=65536):
+    """Index of the most similar centroid for every row, computed in chunks"""
+    assignments = np.empty(vectors.shape[0], dtype=np.int64)
+    for start in range(0, vectors.shape[0], chunk_size):
+        chunk = vectors[start : start + chunk_size]
+        assignments[start : start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(vectors, n_lists, n_iter=20, sample_size=None, seed=0):
+    """Spherical k-means on a sample of the vectors"""
+    rng = np.random.default_rng(seed)
+    n = vectors.shape[0]
+    sample_size = min(n, sample_size or n_lists * 64)
+    sample = normalize_rows(vectors[np.sort(rng.choice(n, sample_size, replace=False))])
+    centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = assign_to_centroids(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_lists)
+        # Re-seed empty lists so every centroid stays useful
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            sums[empty] = sample[rng.choice(sample_size, empty.size, replace=False)]
+        centroids = normalize_rows(sums)
+
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file index for cosine similarity.
+
+    Vectors are grouped by their nearest centroid and stored contiguously per
+    list, so a query only scans the `nprobe` lists closest to it. Raising
+    `nprobe` trades latency for recall.
+    """
+
+    def __init__(self, centroids, vectors, ids, offsets, nprobe=8):
+        self.centroids = centroids
+        self.vectors = vectors
+        self.ids = ids
+        self.offsets = offsets
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, embeddings, ids=None, n_lists=None, n_iter=20, nprobe=8, seed=0):
+        """Train centroids and bucket every embedding into its inverted list"""
+        vectors = normalize_rows(embeddings)
+        n = vectors.shape[0]
+        if ids is None:
+            ids = np.arange(n, dtype=np.int64)
+        ids = np.asarray(ids, dtype=np.int64)
+        # sqrt(n) lists keeps both the coarse and the fine scan small
+        n_lists = min(n, n_lists or max(1, int(np.sqrt(n))))
+
+        centroids = train_centroids(vectors, n_lists, n_iter=n_iter, seed=seed)
+        assignments = assign_to_centroids(vectors, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=n_lists)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        return cls(
+            centroids,
+            np.ascontiguousarray(vectors[order]),
+            ids[order],
+            offsets,
+            nprobe=nprobe,
+        )
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    def search(self, query_embeddings, k=10, nprobe=None):
+        """Top-k (ids, scores) per query, best first"""
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        queries = normalize_rows(query_embeddings)
+        probes = top_k_indices(queries @ self.centroids.T, nprobe)
+
+        all_ids = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        all_scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+        for row, (query, lists) in enumerate(zip(queries, probes)):
+            # Each list is a contiguous slice, so no candidate rows are copied
+            bounds = [(self.offsets[j], self.offsets[j + 1]) for j in lists]
+            candidates = np.concatenate([np.arange(a, b) for a, b in bounds])
+            if candidates.size == 0:
+                continue
+            scores = np.concatenate([self.vectors[a:b] @ query for a, b in bounds])
+            best = top_k_indices(scores, k)
+            all_ids[row, : best.size] = self.ids[candidates[best]]
+            all_scores[row, : best.size] = scores[best]
+
+        return all_ids, all_scores
+
+    def save(self, path):
+        """Persist the index as a directory of .npy files"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "centroids.npy", self.centroids)
+        np.save(path / "vectors.npy", self.vectors)
+        np.save(path / "ids.npy", self.ids)
+        np.save(path / "offsets.npy", self.offsets)
+        (path / "meta.json").write_text(json.dumps({"nprobe": self.nprobe}))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open a saved index; vectors are memory-mapped unless mmap=False"""
+        path = Path(path)
+        mode = "r" if mmap else None
+        meta = json.loads((path / "meta.json").read_text())
+        return cls(
+            np.load(path / "centroids.npy"),
+            np.load(path / "vectors.npy", mmap_mode=mode),
+            np.load(path / "ids.npy"),
+            np.load(path / "offsets.npy"),
+            nprobe=meta["nprobe"],
+        )
+
+
+def benchmark_recall(index, embeddings, queries, k=10, nprobes=(1, 2, 4, 8, 16, 32)):
+    """Recall@k and per-query latency of the index against exact search"""
+    exact_ids, _ = SimilarityEngine(embeddings).search(queries, k)
+
+    results = []
+    for nprobe in nprobes:
+        latencies = []
+        found = []
+        for query in queries:
+            start = time.perf_counter()
+            ids, _ = index.search(query, k, nprobe=nprobe)
+            latencies.append(time.perf_counter() - start)
+            found.append(ids[0])
+
+        hits = sum(
+            len(set(approx) & set(exact)) for approx, exact in zip(found, exact_ids)
+        )
+        latencies_ms = np.array(latencies) * 1000
+        results.append(
+            {
+                "nprobe": nprobe,
+                "recall": hits / (len(queries) * k),
+                "p50_ms": float(np.percentile(latencies_ms, 50)),
+                "p99_ms": float(np.percentile(latencies_ms, 99)),
+            }
+        )
+
+    return results
+
+
+def synthetic_embeddings(n, dim, n_topics=1000, seed=0):
+    """Clustered random vectors that behave roughly like text embeddings"""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((n_topics, dim)).astype(np.float32)
+    labels = rng.integers(0, n_topics, n)
+    noise = rng.standard_normal((n, dim)).astype(np.float32)
+    return topics[labels] + 0.8 * noise
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark IVF recall and latency against brute-force search"
+    )
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=None)
+    args = parser.parse_args()
+
+    embeddings = synthetic_embeddings(args.vectors + args.queries, args.dim)
+    corpus, queries = embeddings[: args.vectors], embeddings[args.vectors :]
+
+    start = time.perf_counter()
+    index = IVFIndex.build(corpus, n_lists=args.lists)
+    print(f"=== IVF Benchmark ===")
+    print(f"Vectors: {len(index)} x {args.dim}, lists: {index.n_lists}")
+    print(f"Build time: {time.perf_counter() - start:.1f}s")
+
+    for row in benchmark_recall(index, corpus, queries, k=args.k):
+        print(
+            f"nprobe={row['nprobe']:>3} | recall@{args.k}: {row['recall']:.3f} | "
+            f"p50: {row['p50_ms']:.2f}ms | p99: {row['p99_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+LLM Bootcamp OpenAI Demo - Keyword Search
+BM25 over an inverted index, and reciprocal-rank fusion for hybrid retrieval
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from llm_utils.similarity import top_k_indices
+
+# Keeps identifiers such as "SKU-1042", "ERR_CONN_RESET" or "v2.1" as one token
+TOKEN_PATTERN = re.compile(r"[a-z0-9_]+(?:[-.][a-z0-9_]+)*")
+
+
+def tokenize(text):
+    """Lower-cased word tokens; compound identifiers also yield their parts"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        parts = re.split(r"[-.]", token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part)
+    return tokens
+
+
+class BM25Index:
+    """Okapi BM25 scorer over an in-memory inverted index"""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.n_documents = len(documents)
+        self.doc_lengths = np.zeros(self.n_documents, dtype=np.float32)
+
+        postings = defaultdict(lambda: ([], []))
+        for doc_id, document in enumerate(documents):
+            counts = Counter(tokenize(document))
+            self.doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                doc_ids, tfs = postings[term]
+                doc_ids.append(doc_id)
+                tfs.append(tf)
+
+        # term -> (doc ids, term frequencies) as compact arrays
+        self.postings = {
+            term: (np.array(doc_ids, dtype=np.int64), np.array(tfs, dtype=np.float32))
+            for term, (doc_ids, tfs) in postings.items()
+        }
+        self.avg_length = float(self.doc_lengths.mean()) if self.n_documents else 0.0
+
+    def idf(self, term):
+        df = len(self.postings[term][0]) if term in self.postings else 0
+        return math.log(1 + (self.n_documents - df + 0.5) / (df + 0.5))
+
+    def scores(self, query):
+        """BM25 score of every document for the query"""
+        scores = np.zeros(self.n_documents, dtype=np.float32)
+        if not self.n_documents:
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / self.avg_length)
+        # Only documents in the query terms' posting lists are touched
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            doc_ids, tfs = self.postings[term]
+            scores[doc_ids] += (
+                self.idf(term) * tfs * (self.k1 + 1) / (tfs + norm[doc_ids])
+            )
+        return scores
+
+    def search(self, query, k=10):
+        """Top-k (doc ids, scores) with a positive score, best first"""
+        scores = self.scores(query)
+        best = top_k_indices(scores, k)
+        best = best[scores[best] > 0]
+        return best, scores[best]
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """
+    Fuse ranked id lists: score(d) = sum over rankings of 1 / (k + rank(d)).
+
+    Returns (score, id) pairs, best first.
+    """
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] += 1.0 / (k + rank)
+    return sorted(((score, doc_id) for doc_id, score in fused.items()), reverse=True)
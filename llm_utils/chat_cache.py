@@ -0,0 +1,222 @@
+"""
+LLM Bootcamp OpenAI Demo - Chat Response Cache
+Exact-match cache for chat completions: in-memory LRU with TTL and an
+optional SQLite tier shared across processes and restarts
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from openai.types.chat import ChatCompletion
+
+from llm_utils.hedging import hedged_call
+
+
+def request_key(request):
+    """Canonical hash of a chat completion request (every parameter counts)"""
+    payload = json.dumps(
+        request, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_deterministic(request):
+    """Only temperature-0, non-streaming, single-choice requests repeat reliably"""
+    return (
+        request.get("temperature") == 0
+        and not request.get("stream")
+        and request.get("n", 1) == 1
+    )
+
+
+class SQLiteResponseStore:
+    """Disk tier: serialized responses with expiry times and LRU eviction"""
+
+    def __init__(self, path="response_cache.sqlite", max_entries=100_000):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access "
+            "ON responses (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """(response JSON, expires_at) or None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return row
+
+    def put(self, key, response_json, expires_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, response_json, expires_at, time.time()),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    Two-tier exact-match cache for chat completion responses.
+
+    Lookups try the in-memory LRU first, then the disk tier (any object with
+    get/put like SQLiteResponseStore), promoting disk hits into memory.
+    Requests that may legitimately return different answers (temperature
+    above 0, streaming, n > 1) bypass the cache unless allow_nondeterministic.
+    """
+
+    def __init__(
+        self,
+        max_entries=1024,
+        ttl=3600.0,
+        disk=None,
+        allow_nondeterministic=False,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk = disk
+        self.allow_nondeterministic = allow_nondeterministic
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+    def cacheable(self, request):
+        return not request.get("stream") and (
+            self.allow_nondeterministic or is_deterministic(request)
+        )
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypassed += 1
+
+    def get(self, request):
+        """Cached response for the request, or None"""
+        key = request_key(request)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._memory[key]
+
+        if self.disk is not None:
+            row = self.disk.get(key)
+            if row is not None:
+                response = ChatCompletion.model_validate_json(row[0])
+                with self._lock:
+                    self._remember(key, response, row[1])
+                    self.disk_hits += 1
+                return response
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key, response, expires_at):
+        self._memory[key] = (response, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def put(self, request, response):
+        key = request_key(request)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, response, expires_at)
+        if self.disk is not None:
+            self.disk.put(key, response.model_dump_json(), expires_at)
+
+    def stats(self):
+        """Hit/miss counters for reporting"""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._memory),
+        }
+
+
+def create_chat_completion(client, cache=None, hedge=None, **request):
+    """
+    client.chat.completions.create through the cache.
+
+    Cache misses are hedged when a HedgePolicy is given. Returns
+    (response, cached) where cached tells whether the API was skipped.
+    """
+
+    def create():
+        if hedge is not None:
+            return hedged_call(hedge, lambda: client.chat.completions.create(**request))
+        return client.chat.completions.create(**request)
+
+    if cache is None:
+        return create(), False
+    if not cache.cacheable(request):
+        cache.record_bypass()
+        return create(), False
+
+    response = cache.get(request)
+    if response is not None:
+        return response, True
+    response = create()
+    cache.put(request, response)
+    return response, False
@@ -0,0 +1,196 @@
+"""
+LLM Bootcamp OpenAI Demo - Token-Budgeted Chat History
+Keeps recent turns verbatim within a token budget and folds older turns into
+a running summary produced on a background thread
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_utils.embedding_batcher import estimate_tokens
+
+# Role, separators and framing the API adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def message_tokens(message, token_counter=estimate_tokens):
+    return token_counter(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def openai_summarizer(client, model="gpt-4o-mini", max_tokens=256):
+    """summarize(summary, turns) that asks a chat model for the new summary"""
+
+    def summarize(summary, turns):
+        transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "Update the running summary of a conversation with "
+                    "the new turns. Keep facts, names, decisions and open "
+                    "questions; reply with the summary only.",
+                },
+                {
+                    "role": "user",
+                    "content": f"Summary so far: {summary or '(none)'}\n\n"
+                    f"New turns:\n{transcript}",
+                },
+            ],
+            temperature=0,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content
+
+    return summarize
+
+
+class ChatHistory:
+    """
+    Conversation history whose prompt stays near `max_tokens`.
+
+    When the verbatim turns exceed the budget, the oldest ones (always at
+    least `keep_recent` turns stay) are handed to `summarize(summary, turns)`
+    on a worker thread, which returns the new running summary. Until it
+    finishes, those turns are still sent verbatim, so the request in flight
+    never waits for summarization and never loses context.
+    """
+
+    def __init__(
+        self,
+        summarize,
+        max_tokens=2000,
+        keep_recent=4,
+        token_counter=estimate_tokens,
+        executor=None,
+    ):
+        self.summarize = summarize
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self.token_counter = token_counter
+        self.summary = ""
+        self.turns = []
+        self.summarizing = []
+        self._future = None
+        self._lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+        # Many histories can share one single-worker executor (e.g. a server)
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1)
+        self.summarized_turns = 0
+        self.prompt_tokens = 0
+        self.full_history_tokens = 0
+        self._all_turn_tokens = 0
+
+    def _tokens(self, messages):
+        return sum(message_tokens(m, self.token_counter) for m in messages)
+
+    def append(self, message):
+        """Record a turn and start summarizing old turns if over budget"""
+        with self._lock:
+            self.turns.append(message)
+            self._all_turn_tokens += message_tokens(message, self.token_counter)
+            self._maybe_summarize()
+
+    def _maybe_summarize(self):
+        if self._future is not None:
+            return
+        excess = self._tokens(self.turns) - self.max_tokens
+        if excess <= 0:
+            return
+        # Oldest turns whose removal brings the verbatim part under budget
+        count = 0
+        while excess > 0 and count < len(self.turns) - self.keep_recent:
+            excess -= message_tokens(self.turns[count], self.token_counter)
+            count += 1
+        if count == 0:
+            return
+        self.summarizing, self.turns = self.turns[:count], self.turns[count:]
+        self._future = self._executor.submit(
+            self.summarize, self.summary, self.summarizing
+        )
+        self._future.add_done_callback(self._finish_summary)
+
+    def _finish_summary(self, future):
+        with self._lock:
+            failed = future.exception() is not None
+            if failed:
+                # Keep the turns verbatim and retry on the next append
+                self.turns = self.summarizing + self.turns
+            else:
+                self.summary = future.result()
+                self.summarized_turns += len(self.summarizing)
+            self.summarizing = []
+            self._future = None
+            if not failed:
+                # Catch up on turns that arrived while this summary ran
+                self._maybe_summarize()
+            if self._future is None:
+                self._idle.notify_all()
+
+    def messages(self, system_message=None):
+        """Prompt messages: system, running summary, then verbatim turns"""
+        with self._lock:
+            messages = [system_message] if system_message else []
+            if self.summary:
+                messages.append(
+                    {
+                        "role": "system",
+                        "content": "Summary of the conversation so far: "
+                        + self.summary,
+                    }
+                )
+            messages += self.summarizing + self.turns
+
+            fixed = self._tokens([system_message]) if system_message else 0
+            self.prompt_tokens += self._tokens(messages)
+            self.full_history_tokens += fixed + self._all_turn_tokens
+            return messages
+
+    def wait(self):
+        """Block until no summarization is pending, including catch-up rounds"""
+        with self._idle:
+            self._idle.wait_for(lambda: self._future is None)
+
+    def stats(self):
+        """Tokens sent versus tokens the full history would have cost"""
+        return {
+            "verbatim_turns": len(self.turns) + len(self.summarizing),
+            "summarized_turns": self.summarized_turns,
+            "prompt_tokens": self.prompt_tokens,
+            "full_history_tokens": self.full_history_tokens,
+            "tokens_saved": self.full_history_tokens - self.prompt_tokens,
+        }
+
+    @property
+    def busy(self):
+        """Whether a summary is being produced for this history"""
+        return self._future is not None
+
+    def state(self):
+        """JSON-serializable snapshot; turns being summarized stay verbatim"""
+        with self._lock:
+            return {
+                "summary": self.summary,
+                "turns": self.summarizing + self.turns,
+                "summarized_turns": self.summarized_turns,
+                "prompt_tokens": self.prompt_tokens,
+                "full_history_tokens": self.full_history_tokens,
+                "all_turn_tokens": self._all_turn_tokens,
+            }
+
+    def restore(self, state):
+        """Load a snapshot taken by state()"""
+        with self._lock:
+            self.summary = state["summary"]
+            self.turns = list(state["turns"])
+            self.summarizing = []
+            self.summarized_turns = state["summarized_turns"]
+            self.prompt_tokens = state["prompt_tokens"]
+            self.full_history_tokens = state["full_history_tokens"]
+            self._all_turn_tokens = state["all_turn_tokens"]
+        return self
+
+    def close(self):
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,130 @@
+"""
+LLM Bootcamp OpenAI Demo - Concurrent Chat Runner
+Runs many chat completions on an AsyncOpenAI client with bounded concurrency,
+yielding each result as soon as it completes
+"""
+
+import asyncio
+import time
+
+import numpy as np
+
+from llm_utils.hedging import ahedged_call
+
+
+class ChatRunner:
+    """
+    Bounded-concurrency chat completions over an iterable of message lists.
+
+    At most `max_concurrency` requests are in flight, and conversations are
+    pulled from the iterable only as slots free up, so arbitrarily long (or
+    generated) inputs never sit in memory as pending tasks. Each result is a
+    dict with the conversation's original index, the response (or error),
+    latency in seconds and token usage. An optional HedgePolicy duplicates
+    slow requests and cancels the slower copy.
+    """
+
+    def __init__(
+        self,
+        client,
+        model="gpt-3.5-turbo",
+        max_concurrency=16,
+        hedge=None,
+        **create_kwargs,
+    ):
+        self.client = client
+        self.hedge = hedge
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.create_kwargs = create_kwargs
+        self.latencies = []
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    async def _complete(self, index, messages):
+        def create():
+            return self.client.chat.completions.create(
+                model=self.model, messages=messages, **self.create_kwargs
+            )
+
+        start = time.perf_counter()
+        try:
+            if self.hedge is not None:
+                response = await ahedged_call(self.hedge, create)
+            else:
+                response = await create()
+            error = None
+        except Exception as e:
+            response, error = None, e
+        latency = time.perf_counter() - start
+
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        self.requests += 1
+        self.errors += error is not None
+        self.latencies.append(latency)
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        return {
+            "index": index,
+            "response": response,
+            "error": error,
+            "latency": latency,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        }
+
+    async def run(self, conversations):
+        """Async generator of result dicts in completion order"""
+        slots = asyncio.Semaphore(self.max_concurrency)
+        done = asyncio.Queue()
+        pending = 0
+
+        async def complete(index, messages):
+            try:
+                await done.put(await self._complete(index, messages))
+            finally:
+                slots.release()
+
+        tasks = set()
+        try:
+            for index, messages in enumerate(conversations):
+                # A slot frees only after its result is queued, so results are
+                # yielded as soon as the request that unblocked us completes
+                await slots.acquire()
+                task = asyncio.create_task(complete(index, messages))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                pending += 1
+                while not done.empty():
+                    pending -= 1
+                    yield done.get_nowait()
+
+            while pending:
+                pending -= 1
+                yield await done.get()
+        finally:
+            # The consumer stopped early or was cancelled: abort what is left
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run_all(self, conversations):
+        """All results, ordered by original index"""
+        results = [result async for result in self.run(conversations)]
+        return sorted(results, key=lambda result: result["index"])
+
+    def stats(self):
+        latencies = np.array(self.latencies) if self.latencies else np.zeros(1)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_p50": float(np.percentile(latencies, 50)),
+            "latency_p95": float(np.percentile(latencies, 95)),
+            "latency_max": float(latencies.max()),
+        }
@@ -0,0 +1,376 @@
+"""
+LLM Bootcamp OpenAI Demo - Multi-Session Chat Server
+Minimal asyncio HTTP/1.1 server with per-session chat state: hot sessions in
+memory, idle ones evicted (LRU) to a compressed SQLite store, and replies
+streamed as server-sent events
+
+Routes:
+    POST   /sessions/<id>/messages   {"message": "..."} -> JSON, or SSE when the
+                                     request sends Accept: text/event-stream
+    DELETE /sessions/<id>            409 while a reply is in flight
+    GET    /stats
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from urllib.parse import parse_qs
+
+from llm_utils.streaming import SSESink
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    409: "Conflict",
+    500: "Server Error",
+}
+
+
+class BadRequest(Exception):
+    """A request that cannot be parsed as HTTP/1.1"""
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body or b"{}")
+
+    @property
+    def keep_alive(self):
+        return self.headers.get("connection", "").lower() != "close"
+
+
+async def read_request(reader):
+    """Parse one HTTP/1.1 request, or None when the client closed the connection"""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise BadRequest("malformed request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise BadRequest("invalid Content-Length") from None
+    if length < 0:
+        raise BadRequest("invalid Content-Length")
+    body = await reader.readexactly(length)
+    path, _, query = target.partition("?")
+    return Request(method, path, parse_qs(query), headers, body)
+
+
+async def send_json(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        (
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        ).encode("latin-1")
+        + body
+    )
+    await writer.drain()
+
+
+async def start_sse(writer):
+    """Send event-stream headers; the body runs until the connection closes"""
+    writer.write(
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: text/event-stream\r\n"
+        b"Cache-Control: no-cache\r\n"
+        b"Connection: close\r\n\r\n"
+    )
+    await writer.drain()
+
+
+async def send_sse(writer, data, event=None):
+    message = f"event: {event}\n" if event else ""
+    message += f"data: {data}\n\n"
+    writer.write(message.encode("utf-8"))
+    await writer.drain()
+
+
+class SessionStore:
+    """
+    Session id -> ChatHistory with at most `max_hot` sessions in memory.
+
+    `create()` returns an empty history. Least recently used sessions that are
+    idle (no request or summary in flight) are serialized with zlib into a
+    SQLite table and restored on their next request. The table itself keeps at
+    most `max_stored` sessions, dropping the least recently used.
+    """
+
+    def __init__(self, path, create, max_hot=1000, max_stored=None):
+        self.create = create
+        self.max_hot = max_hot
+        self.max_stored = max_stored
+        self._hot = OrderedDict()
+        self._locks = {}
+        self._users = {}
+        self.loads = 0
+        self.evictions = 0
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                state BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sessions_last_access "
+            "ON sessions (last_access)"
+        )
+        self._conn.commit()
+
+    @asynccontextmanager
+    async def session(self, session_id):
+        """Exclusive use of one session's history for the duration of a turn"""
+        self._users[session_id] = self._users.get(session_id, 0) + 1
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        try:
+            async with lock:
+                yield self.get(session_id)
+        finally:
+            self._users[session_id] -= 1
+            if not self._users[session_id]:
+                del self._users[session_id]
+                if session_id not in self._hot:
+                    self._locks.pop(session_id, None)
+                # Sessions skipped while in use can go now
+                self._evict()
+
+    def get(self, session_id):
+        history = self._hot.get(session_id)
+        if history is not None:
+            self._hot.move_to_end(session_id)
+            return history
+
+        row = self._conn.execute(
+            "SELECT state FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        history = self.create()
+        if row is not None:
+            history.restore(json.loads(zlib.decompress(row[0])))
+            self._conn.execute(
+                "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+            )
+            self._conn.commit()
+            self.loads += 1
+        self._hot[session_id] = history
+        self._evict()
+        return history
+
+    def _write(self, rows):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)",
+            [
+                (session_id, zlib.compress(json.dumps(history.state()).encode()), now)
+                for session_id, history, now in rows
+            ],
+        )
+        if self.max_stored is not None:
+            self._conn.execute(
+                "DELETE FROM sessions WHERE session_id IN (SELECT session_id "
+                "FROM sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_stored,),
+            )
+        self._conn.commit()
+
+    def _evict(self):
+        overflow = len(self._hot) - self.max_hot
+        if overflow <= 0:
+            return
+        evicted = []
+        for session_id, history in self._hot.items():
+            if len(evicted) == overflow:
+                break
+            if history.busy or session_id in self._users:
+                continue
+            evicted.append((session_id, history, time.time()))
+        self._write(evicted)
+        for session_id, history, _ in evicted:
+            del self._hot[session_id]
+            self._locks.pop(session_id, None)
+            history.close()
+        self.evictions += len(evicted)
+
+    def delete(self, session_id):
+        """
+        Drop a session; returns whether it existed, or None (nothing deleted)
+        while a turn is in flight for it
+        """
+        if session_id in self._users:
+            return None
+        history = self._hot.pop(session_id, None)
+        self._locks.pop(session_id, None)
+        existed = history is not None
+        if existed:
+            history.close()
+        cursor = self._conn.execute(
+            "DELETE FROM sessions WHERE session_id = ?", (session_id,)
+        )
+        self._conn.commit()
+        return existed or cursor.rowcount > 0
+
+    def stats(self):
+        (stored,) = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return {
+            "hot": len(self._hot),
+            "stored": stored,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        """Persist every hot session"""
+        now = time.time()
+        self._write([(sid, history, now) for sid, history in self._hot.items()])
+        self._conn.close()
+
+
+class ChatServer:
+    """
+    Routes HTTP requests to `respond(history, message)`, an async generator
+    of reply deltas that records the turn in the session's history.
+    """
+
+    def __init__(self, respond, sessions, host="127.0.0.1", port=8000):
+        self.respond = respond
+        self.sessions = sessions
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.active = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except BadRequest as e:
+                    await send_json(writer, 400, {"error": str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                keep_alive = await self._route(request, writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, request, writer):
+        """Answer one request; returns whether the connection stays open"""
+        parts = request.path.strip("/").split("/")
+        if request.method == "GET" and parts == ["stats"]:
+            stats = {"requests": self.requests, "active": self.active}
+            stats.update(self.sessions.stats())
+            await send_json(writer, 200, stats, request.keep_alive)
+            return request.keep_alive
+
+        if len(parts) >= 2 and parts[0] == "sessions":
+            session_id = parts[1]
+            if request.method == "DELETE" and len(parts) == 2:
+                deleted = self.sessions.delete(session_id)
+                if deleted is None:
+                    await send_json(
+                        writer, 409, {"error": "session is busy"}, request.keep_alive
+                    )
+                    return request.keep_alive
+                await send_json(
+                    writer,
+                    200 if deleted else 404,
+                    {"deleted": deleted},
+                    request.keep_alive,
+                )
+                return request.keep_alive
+            if request.method == "POST" and parts[2:] == ["messages"]:
+                return await self._message(session_id, request, writer)
+
+        await send_json(writer, 404, {"error": "not found"}, request.keep_alive)
+        return request.keep_alive
+
+    async def _message(self, session_id, request, writer):
+        try:
+            message = request.json()["message"]
+        except (ValueError, KeyError, TypeError):
+            await send_json(
+                writer, 400, {"error": 'expected {"message": ...}'}, request.keep_alive
+            )
+            return request.keep_alive
+
+        stream = "text/event-stream" in request.headers.get("accept", "")
+        self.requests += 1
+        self.active += 1
+        try:
+            async with self.sessions.session(session_id) as history:
+                if stream:
+                    await start_sse(writer)
+                    # Deltas are coalesced into one event per interval, and the
+                    # socket is only drained after an event was written
+                    sink = SSESink(writer.write)
+                    try:
+                        async for delta in self.respond(history, message):
+                            sent = sink.sent
+                            sink.write(delta)
+                            if sink.sent != sent:
+                                await writer.drain()
+                        sink.close()
+                        await send_sse(writer, "{}", event="done")
+                    except Exception as e:
+                        sink.close()
+                        await send_sse(writer, json.dumps({"error": str(e)}), "error")
+                    return False
+
+                try:
+                    parts = [delta async for delta in self.respond(history, message)]
+                except Exception as e:
+                    await send_json(writer, 500, {"error": str(e)}, request.keep_alive)
+                    return request.keep_alive
+                await send_json(
+                    writer, 200, {"reply": "".join(parts)}, request.keep_alive
+                )
+                return request.keep_alive
+        finally:
+            self.active -= 1
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.sessions.close()
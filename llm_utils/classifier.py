@@ -0,0 +1,56 @@
+"""
+LLM Bootcamp OpenAI Demo - Nearest-Centroid Classifier
+Local text classification from labelled embeddings, one matmul per batch
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from llm_utils.similarity import normalize_rows
+
+
+class CentroidClassifier:
+    """Assigns each embedding to the category whose normalized centroid is closest"""
+
+    def __init__(self, labels, centroids, model=None):
+        self.labels = list(labels)
+        self.centroids = normalize_rows(centroids)
+        self.model = model
+
+    @classmethod
+    def fit(cls, embeddings, labels, model=None):
+        """One centroid per label: the re-normalized mean of its unit vectors"""
+        vectors = normalize_rows(embeddings)
+        labels = np.asarray(labels)
+        categories = list(dict.fromkeys(labels.tolist()))
+        centroids = np.vstack(
+            [vectors[labels == category].mean(axis=0) for category in categories]
+        )
+        return cls(categories, centroids, model=model)
+
+    def scores(self, embeddings):
+        """(n_texts, n_labels) cosine similarity to every centroid"""
+        return normalize_rows(embeddings) @ self.centroids.T
+
+    def predict(self, embeddings):
+        """Best label and its similarity for every embedding"""
+        scores = self.scores(embeddings)
+        best = np.argmax(scores, axis=1)
+        return [self.labels[i] for i in best], scores[np.arange(len(best)), best]
+
+    def save(self, path):
+        """Persist centroids (.npy) and labels/model (.json) in a directory"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "centroids.npy", self.centroids)
+        (path / "labels.json").write_text(
+            json.dumps({"labels": self.labels, "model": self.model})
+        )
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        meta = json.loads((path / "labels.json").read_text())
+        return cls(meta["labels"], np.load(path / "centroids.npy"), model=meta["model"])
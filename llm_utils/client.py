@@ -0,0 +1,383 @@
+"""
+LLM Bootcamp OpenAI Demo - Shared Client Factory
+One pooled OpenAI / AsyncOpenAI client per process, with keep-alive tuning,
+exponential backoff with jitter on 429/5xx, and a token-bucket limiter
+(requests/min and tokens/min) shared by every caller. In-flight requests are
+capped by an AIMD controller that reads the x-ratelimit-* response headers
+(llm_utils/concurrency.py)
+
+Limits are read from the environment:
+    OPENAI_RPM, OPENAI_TPM          requests and tokens per minute (unset = no limit)
+    OPENAI_MAX_RETRIES              retries per request on 408/409/429/5xx (default 5)
+    OPENAI_MAX_CONNECTIONS          pool size (default 100)
+    OPENAI_MAX_KEEPALIVE            idle connections kept open (default 20)
+    OPENAI_KEEPALIVE_EXPIRY         seconds an idle connection is kept (default 60)
+    OPENAI_INITIAL_CONCURRENCY      starting in-flight request limit (default 16)
+    OPENAI_MAX_CONCURRENCY          ceiling for the adaptive limit (default 128)
+"""
+
+import asyncio
+import email.utils
+import functools
+import json
+import math
+import os
+import random
+import threading
+import time
+import warnings
+import weakref
+
+from openai import AsyncOpenAI, OpenAI
+
+from llm_utils.concurrency import AdaptiveConcurrency
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Refills `per_minute` units per minute up to `capacity`.
+
+    reserve() hands out units immediately and lets the balance go negative,
+    returning how long the caller must wait; later callers queue behind it,
+    so concurrent threads and tasks are served in arrival order.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.available = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        with self._lock:
+            now = time.monotonic()
+            self.available = min(
+                self.capacity, self.available + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            # A request larger than the bucket would otherwise wait forever
+            self.available -= min(amount, self.capacity)
+            return max(0.0, -self.available / self.rate)
+
+
+class RateLimiter:
+    """Requests/min and tokens/min buckets; either may be None (unlimited)"""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+        self.retries = 0
+
+    def reserve(self, tokens):
+        """Seconds to wait before sending a request of about `tokens` tokens"""
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            self.throttled += 1
+            self.throttled_seconds += wait
+        return wait
+
+    def stats(self):
+        return {
+            "throttled": self.throttled,
+            "throttled_seconds": self.throttled_seconds,
+            "retries": self.retries,
+        }
+
+
+def estimate_request_tokens(request):
+    """Rough prompt + completion token count of a JSON API request"""
+    if "json" not in request.headers.get("content-type", ""):
+        return 0
+    try:
+        body = json.loads(request.content)
+    except (ValueError, httpx.RequestNotRead):
+        return 0
+    prompt = body.get("input") or body.get("prompt") or body.get("messages") or ""
+    completion = body.get("max_tokens") or body.get("max_completion_tokens") or 0
+    return math.ceil(len(json.dumps(prompt)) / 4) + completion
+
+
+def backoff_delay(attempt, response=None, base=0.5, maximum=30.0):
+    """Full-jitter exponential backoff, never shorter than a Retry-After header"""
+    delay = random.uniform(0, min(maximum, base * 2**attempt))
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            parsed = email.utils.parsedate_to_datetime(retry_after)
+            delay = max(delay, parsed.timestamp() - time.time())
+    return min(delay, maximum)
+
+
+if httpx is not None:
+
+    class _ReleasingStream(httpx.SyncByteStream):
+        """Response body that frees its concurrency slot when closed"""
+
+        def __init__(self, stream, release):
+            self._stream = stream
+            self._release = release
+
+        def __iter__(self):
+            yield from self._stream
+
+        def close(self):
+            try:
+                self._stream.close()
+            finally:
+                release, self._release = self._release, None
+                if release is not None:
+                    release()
+
+    class _AsyncReleasingStream(httpx.AsyncByteStream):
+        def __init__(self, stream, release):
+            self._stream = stream
+            self._release = release
+
+        async def __aiter__(self):
+            async for part in self._stream:
+                yield part
+
+        async def aclose(self):
+            try:
+                await self._stream.aclose()
+            finally:
+                release, self._release = self._release, None
+                if release is not None:
+                    release()
+
+    class LimitedTransport(httpx.HTTPTransport):
+        """
+        Pooled transport that rate-limits, bounds concurrency and retries
+        every request.
+
+        A request holds its concurrency slot until its response body is
+        closed, so a stream counts as in flight until it has been read.
+        """
+
+        def __init__(self, limiter, concurrency, max_retries=5, **kwargs):
+            super().__init__(**kwargs)
+            self.limiter = limiter
+            self.concurrency = concurrency
+            self.max_retries = max_retries
+
+        def _send(self, request, tokens):
+            time.sleep(self.limiter.reserve(tokens))
+            self.concurrency.acquire()
+            try:
+                time.sleep(self.concurrency.send())
+                response = super().handle_request(request)
+            except BaseException:
+                self.concurrency.release()
+                raise
+            response.stream = _ReleasingStream(
+                response.stream,
+                functools.partial(
+                    self.concurrency.release,
+                    response.status_code,
+                    response.headers,
+                    tokens,
+                ),
+            )
+            return response
+
+        def handle_request(self, request):
+            tokens = estimate_request_tokens(request)
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = self._send(request, tokens)
+                except httpx.TransportError:
+                    if attempt == self.max_retries:
+                        raise
+                    response = None
+                else:
+                    if (
+                        response.status_code not in RETRY_STATUSES
+                        or attempt == self.max_retries
+                    ):
+                        return response
+                    response.close()
+                self.limiter.retries += 1
+                time.sleep(backoff_delay(attempt, response))
+
+    class AsyncLimitedTransport(httpx.AsyncHTTPTransport):
+        """LimitedTransport for AsyncOpenAI; waits without blocking the loop"""
+
+        def __init__(self, limiter, concurrency, max_retries=5, **kwargs):
+            super().__init__(**kwargs)
+            self.limiter = limiter
+            self.concurrency = concurrency
+            self.max_retries = max_retries
+
+        async def _send(self, request, tokens):
+            await asyncio.sleep(self.limiter.reserve(tokens))
+            await self.concurrency.aacquire()
+            try:
+                await asyncio.sleep(self.concurrency.send())
+                response = await super().handle_async_request(request)
+            except BaseException:
+                self.concurrency.release()
+                raise
+            response.stream = _AsyncReleasingStream(
+                response.stream,
+                functools.partial(
+                    self.concurrency.release,
+                    response.status_code,
+                    response.headers,
+                    tokens,
+                ),
+            )
+            return response
+
+        async def handle_async_request(self, request):
+            tokens = estimate_request_tokens(request)
+            for attempt in range(self.max_retries + 1):
+                try:
+                    response = await self._send(request, tokens)
+                except httpx.TransportError:
+                    if attempt == self.max_retries:
+                        raise
+                    response = None
+                else:
+                    if (
+                        response.status_code not in RETRY_STATUSES
+                        or attempt == self.max_retries
+                    ):
+                        return response
+                    await response.aclose()
+                self.limiter.retries += 1
+                await asyncio.sleep(backoff_delay(attempt, response))
+
+
+def _env_number(name, default=None, kind=float):
+    value = os.getenv(name)
+    return kind(value) if value else default
+
+
+# Shared by every client this module creates
+default_limiter = RateLimiter(
+    requests_per_minute=_env_number("OPENAI_RPM"),
+    tokens_per_minute=_env_number("OPENAI_TPM"),
+)
+default_concurrency = AdaptiveConcurrency(
+    initial_limit=_env_number("OPENAI_INITIAL_CONCURRENCY", 16, int),
+    max_limit=_env_number("OPENAI_MAX_CONCURRENCY", 128, int),
+)
+
+_clients = {}
+# Async clients made inside a running loop: loop -> {(api_key, base_url): client}
+_loop_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def _transport_options():
+    return {
+        "limiter": default_limiter,
+        "concurrency": default_concurrency,
+        "max_retries": _env_number("OPENAI_MAX_RETRIES", 5, int),
+        "limits": httpx.Limits(
+            max_connections=_env_number("OPENAI_MAX_CONNECTIONS", 100, int),
+            max_keepalive_connections=_env_number("OPENAI_MAX_KEEPALIVE", 20, int),
+            keepalive_expiry=_env_number("OPENAI_KEEPALIVE_EXPIRY", 60.0),
+        ),
+    }
+
+
+def _make_client(kind, api_key, base_url):
+    if httpx is None:
+        # httpx is in requirements.txt; without it the SDK's own pooling and
+        # retries are used, with no rate limiting
+        warnings.warn(
+            "httpx is not installed: OpenAI clients from llm_utils.client run "
+            "without the shared rate limiter, jittered retries or pool tuning "
+            "(pip install httpx)",
+            RuntimeWarning,
+            stacklevel=3,
+        )
+        return kind(api_key=api_key, base_url=base_url)
+    if kind is OpenAI:
+        http_client = httpx.Client(transport=LimitedTransport(**_transport_options()))
+    else:
+        http_client = httpx.AsyncClient(
+            transport=AsyncLimitedTransport(**_transport_options())
+        )
+    # Retries happen in the transport, under the shared limiter
+    return kind(
+        api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0
+    )
+
+
+def get_client(api_key=None, base_url=None):
+    """Process-wide OpenAI client for this key and base URL"""
+    key = (OpenAI, api_key, base_url)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = _make_client(OpenAI, api_key, base_url)
+        return _clients[key]
+
+
+def get_async_client(api_key=None, base_url=None):
+    """
+    AsyncOpenAI client for this key and base URL.
+
+    Its connection pool belongs to one event loop. Called inside a running
+    loop, it returns that loop's own client, so separate asyncio.run() calls
+    never share connections; close them with aclose_async_clients() before
+    the loop ends. Called outside a loop (e.g. at import time), it returns a
+    process-wide client that must only be used from one loop.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _clients_lock:
+        if loop is None:
+            clients, key = _clients, (AsyncOpenAI, api_key, base_url)
+        else:
+            clients, key = _loop_clients.setdefault(loop, {}), (api_key, base_url)
+        if key not in clients:
+            clients[key] = _make_client(AsyncOpenAI, api_key, base_url)
+        return clients[key]
+
+
+async def aclose_async_clients():
+    """Close the clients get_async_client made for the running loop"""
+    with _clients_lock:
+        clients = _loop_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+
+def client_stats():
+    """
+    Shared limiter counters plus the adaptive concurrency state: current
+    limit, in-flight requests, queue depth and throttle events.
+
+    `rate_limited` and `adaptive` are False when httpx is missing and clients
+    fell back to the plain SDK; nothing reads the rate-limit headers then, so
+    the limiter and concurrency fields are None.
+    """
+    active = httpx is not None
+    limiter = default_limiter.stats()
+    concurrency = default_concurrency.stats()
+    if not active:
+        limiter = dict.fromkeys(limiter)
+        concurrency = dict.fromkeys(concurrency)
+    return {"rate_limited": active, "adaptive": active, **limiter, **concurrency}
@@ -0,0 +1,120 @@
+"""
+LLM Bootcamp OpenAI Demo - Topic Clustering
+Streaming spherical mini-batch k-means over (memory-mapped) embedding matrices
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from llm_utils.similarity import normalize_rows
+
+
+def kmeans_plus_plus(vectors, n_clusters, rng):
+    """k-means++ seeding on unit vectors (cosine distance)"""
+    centroids = np.empty((n_clusters, vectors.shape[1]), dtype=np.float32)
+    centroids[0] = vectors[rng.integers(vectors.shape[0])]
+    distances = np.maximum(1 - vectors @ centroids[0], 0)
+    for i in range(1, n_clusters):
+        total = distances.sum()
+        if total > 0:
+            choice = rng.choice(vectors.shape[0], p=distances / total)
+        else:
+            choice = rng.integers(vectors.shape[0])
+        centroids[i] = vectors[choice]
+        np.minimum(distances, np.maximum(1 - vectors @ centroids[i], 0), out=distances)
+    return centroids
+
+
+class MiniBatchKMeans:
+    """
+    Spherical mini-batch k-means (Sculley, 2010) that never loads the full matrix.
+
+    Training reads random contiguous batches, and assignment streams the
+    matrix in chunks across a thread pool (NumPy releases the GIL in matmul).
+    """
+
+    def __init__(
+        self,
+        n_clusters,
+        batch_size=10_000,
+        max_batches=200,
+        chunk_size=65_536,
+        n_jobs=None,
+        seed=0,
+    ):
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.seed = seed
+        self.centroids = None
+
+    def fit(self, vectors):
+        """Learn centroids from mini-batches of vectors"""
+        rng = np.random.default_rng(self.seed)
+        n = vectors.shape[0]
+        if n < self.n_clusters:
+            raise ValueError(f"Need at least {self.n_clusters} vectors, got {n}")
+
+        seed_size = min(n, max(self.batch_size, self.n_clusters * 20))
+        seed_rows = np.sort(rng.choice(n, seed_size, replace=False))
+        centroids = kmeans_plus_plus(
+            normalize_rows(vectors[seed_rows]), self.n_clusters, rng
+        )
+        counts = np.zeros(self.n_clusters, dtype=np.float64)
+
+        batch_size = min(self.batch_size, n)
+        for _ in range(self.max_batches):
+            start = rng.integers(0, n - batch_size + 1)
+            batch = normalize_rows(vectors[start : start + batch_size])
+            labels = np.argmax(batch @ centroids.T, axis=1)
+
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, batch)
+            batch_counts = np.bincount(labels, minlength=self.n_clusters)
+            updated = batch_counts > 0
+            counts[updated] += batch_counts[updated]
+
+            # Per-centroid learning rate decays as the centroid sees more points
+            rate = (batch_counts[updated] / counts[updated])[:, None].astype(np.float32)
+            means = sums[updated] / batch_counts[updated][:, None]
+            centroids[updated] = (1 - rate) * centroids[updated] + rate * means
+            centroids = normalize_rows(centroids)
+
+        self.centroids = centroids
+        return self
+
+    def _assign_chunk(self, vectors, start):
+        chunk = normalize_rows(vectors[start : start + self.chunk_size])
+        scores = chunk @ self.centroids.T
+        labels = np.argmax(scores, axis=1)
+        return start, labels, scores[np.arange(labels.size), labels]
+
+    def assign(self, vectors):
+        """Cluster id and similarity to its centroid for every row"""
+        n = vectors.shape[0]
+        labels = np.empty(n, dtype=np.int32)
+        scores = np.empty(n, dtype=np.float32)
+        starts = range(0, n, self.chunk_size)
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+            for start, chunk_labels, chunk_scores in pool.map(
+                lambda start: self._assign_chunk(vectors, start), starts
+            ):
+                labels[start : start + chunk_labels.size] = chunk_labels
+                scores[start : start + chunk_scores.size] = chunk_scores
+        return labels, scores
+
+
+def representatives(labels, scores, n_clusters, per_cluster=3):
+    """Rows closest to each centroid: {cluster id: [row, ...]}"""
+    order = np.lexsort((-scores, labels))
+    boundaries = np.searchsorted(labels[order], np.arange(n_clusters + 1))
+    return {
+        cluster: order[boundaries[cluster] : boundaries[cluster + 1]][
+            :per_cluster
+        ].tolist()
+        for cluster in range(n_clusters)
+    }
@@ -0,0 +1,200 @@
+"""
+LLM Bootcamp OpenAI Demo - Adaptive Concurrency
+AIMD limit on in-flight API requests driven by 429s and the
+x-ratelimit-remaining-* / x-ratelimit-reset-* response headers, with pacing
+that spreads the remaining quota over the time left until it resets
+"""
+
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_reset(value):
+    """Seconds in an x-ratelimit-reset-* value such as "20ms", "1s" or "6m0s" """
+    if not value:
+        return None
+    parts = _DURATION.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _UNIT_SECONDS[unit] for amount, unit in parts)
+
+
+def _header_number(headers, name):
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class AdaptiveConcurrency:
+    """
+    Limits in-flight requests to `limit`, adjusted by AIMD.
+
+    Every response that leaves more than `headroom` of both quotas raises the
+    limit by `increase / limit` (about +increase per round trip of the whole
+    window). A 429, or a response that leaves less than `headroom` of either
+    quota, multiplies it by `backoff` at most once per `cooldown` seconds, so
+    a burst of throttled responses only cuts it once.
+
+    While a quota is below `headroom`, send() also spaces requests so the
+    remaining quota lasts until its reset time instead of running out early.
+
+    Threads use acquire(), coroutines aacquire(); both share one FIFO queue.
+    Never call acquire() on an event loop thread whose tasks hold slots.
+    """
+
+    def __init__(
+        self,
+        initial_limit=16,
+        min_limit=1,
+        max_limit=128,
+        increase=1.0,
+        backoff=0.5,
+        headroom=0.1,
+        cooldown=1.0,
+        max_events=100,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.throttle_events = 0
+        self.events = deque(maxlen=max_events)
+        self.remaining = {"requests": None, "tokens": None}
+        self.paced_seconds = 0.0
+        self._spacing = 0.0
+        self._next_send = 0.0
+        self._last_decrease = float("-inf")
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self):
+        return len(self._waiters)
+
+    def _has_room(self):
+        return self.in_flight < max(self.min_limit, int(self.limit))
+
+    def acquire(self):
+        with self._lock:
+            if not self._waiters and self._has_room():
+                self.in_flight += 1
+                return
+            ready = threading.Event()
+            self._waiters.append(ready)
+        ready.wait()
+
+    async def aacquire(self):
+        with self._lock:
+            if not self._waiters and self._has_room():
+                self.in_flight += 1
+                return
+            ready = asyncio.get_running_loop().create_future()
+            self._waiters.append(ready)
+        try:
+            await ready
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = ready in self._waiters
+                if queued:
+                    self._waiters.remove(ready)
+            # A slot handed over just before the cancellation must go back;
+            # if `ready` itself was cancelled, _hand_over releases it instead
+            if not queued and ready.done() and not ready.cancelled():
+                self.release()
+            raise
+
+    def _hand_over(self, ready):
+        if ready.cancelled():
+            self.release()
+        else:
+            ready.set_result(None)
+
+    def _wake(self):
+        """Give free slots to queued waiters in order; caller holds the lock"""
+        while self._waiters and self._has_room():
+            ready = self._waiters.popleft()
+            self.in_flight += 1
+            if isinstance(ready, threading.Event):
+                ready.set()
+            else:
+                ready.get_loop().call_soon_threadsafe(self._hand_over, ready)
+
+    def send(self):
+        """Seconds to wait before sending, when pacing a nearly spent quota"""
+        with self._lock:
+            if not self._spacing:
+                return 0.0
+            now = time.monotonic()
+            self._next_send = max(now, self._next_send + self._spacing)
+            delay = self._next_send - now
+            self.paced_seconds += delay
+            return delay
+
+    def release(self, status_code=None, headers=None, tokens=0):
+        """Free a slot, adapting the limit to the response it produced"""
+        with self._lock:
+            self.in_flight -= 1
+            if status_code is not None:
+                self._adapt(status_code, headers or {}, tokens)
+            self._wake()
+
+    def _adapt(self, status_code, headers, tokens):
+        spacing = 0.0
+        low = None
+        for quota in ("requests", "tokens"):
+            remaining = _header_number(headers, f"x-ratelimit-remaining-{quota}")
+            total = _header_number(headers, f"x-ratelimit-limit-{quota}")
+            reset = parse_reset(headers.get(f"x-ratelimit-reset-{quota}"))
+            if remaining is None:
+                continue
+            self.remaining[quota] = remaining
+            if not total or remaining > self.headroom * total:
+                continue
+            low = low or f"remaining {quota} {remaining:g}/{total:g}"
+            if reset:
+                # Requests' worth of quota left, in units of this request
+                per_request = max(tokens, 1) if quota == "tokens" else 1
+                spacing = max(spacing, reset / max(remaining / per_request, 1.0))
+        self._spacing = spacing
+
+        if status_code == 429:
+            self._decrease("429")
+        elif low:
+            self._decrease(low)
+        elif status_code < 400:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+
+    def _decrease(self, reason):
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff)
+        self.throttle_events += 1
+        self.events.append({"time": time.time(), "reason": reason, "limit": self.limit})
+
+    def stats(self):
+        with self._lock:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._waiters),
+                "throttle_events": self.throttle_events,
+                "paced_seconds": self.paced_seconds,
+                "remaining_requests": self.remaining["requests"],
+                "remaining_tokens": self.remaining["tokens"],
+            }
@@ -0,0 +1,88 @@
+"""
+LLM Bootcamp OpenAI Demo - Near-Duplicate Detection
+Random-hyperplane LSH bucketing; exact cosine checks only within shared buckets
+"""
+
+import numpy as np
+
+from llm_utils.similarity import normalize_rows
+
+
+def lsh_signatures(vectors, n_tables=8, n_bits=16, seed=0, chunk_size=65536):
+    """
+    One bucket key per row per table.
+
+    Each table hashes a vector to the sign pattern of its projection onto
+    n_bits random hyperplanes, so vectors at a small angle usually collide.
+    """
+    if n_bits > 63:
+        raise ValueError("n_bits must fit in a 64-bit bucket key")
+    rng = np.random.default_rng(seed)
+    planes = rng.standard_normal((vectors.shape[1], n_tables * n_bits)).astype(
+        np.float32
+    )
+    weights = (1 << np.arange(n_bits, dtype=np.int64)).astype(np.int64)
+
+    keys = np.empty((vectors.shape[0], n_tables), dtype=np.int64)
+    for start in range(0, vectors.shape[0], chunk_size):
+        chunk = np.asarray(vectors[start : start + chunk_size], dtype=np.float32)
+        bits = (chunk @ planes > 0).reshape(-1, n_tables, n_bits)
+        keys[start : start + chunk_size] = bits @ weights
+    return keys
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = np.arange(n)
+        # Only rows that were ever merged can belong to a duplicate cluster
+        self.touched = set()
+
+    def find(self, i):
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, i, j):
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i != root_j:
+            self.parent[max(root_i, root_j)] = min(root_i, root_j)
+            self.touched.update((i, j))
+
+
+def find_near_duplicates(
+    vectors, threshold=0.95, n_tables=8, n_bits=16, max_bucket=2000, seed=0
+):
+    """
+    Clusters of rows whose cosine similarity is at least threshold.
+
+    Returns a list of row-index lists (each of size > 1, sorted, smallest
+    row first) and the number of exact comparisons made. Buckets larger
+    than max_bucket are compared in max_bucket-sized blocks.
+    """
+    keys = lsh_signatures(vectors, n_tables=n_tables, n_bits=n_bits, seed=seed)
+    groups = _UnionFind(vectors.shape[0])
+    comparisons = 0
+
+    for table in range(n_tables):
+        order = np.argsort(keys[:, table], kind="stable")
+        sorted_keys = keys[order, table]
+        boundaries = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for bucket in np.split(order, boundaries):
+            if bucket.size < 2:
+                continue
+            bucket = np.sort(bucket)
+            for start in range(0, bucket.size, max_bucket):
+                rows = bucket[start : start + max_bucket]
+                block = normalize_rows(vectors[rows])
+                similar = np.triu(block @ block.T >= threshold, k=1)
+                comparisons += rows.size * (rows.size - 1) // 2
+                for i, j in zip(*np.nonzero(similar)):
+                    groups.union(int(rows[i]), int(rows[j]))
+
+    clusters = {}
+    for row in sorted(groups.touched):
+        clusters.setdefault(groups.find(row), []).append(row)
+    return [members for members in clusters.values() if len(members) > 1], comparisons
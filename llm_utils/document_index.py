@@ -0,0 +1,338 @@
+"""
+LLM Bootcamp OpenAI Demo - Incremental Document Index
+Upserts and deletes by document id over an append-only EmbeddingStore, with
+tombstones and (background) compaction
+"""
+
+import hashlib
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from llm_utils.embedding_cache import normalize_text
+from llm_utils.embedding_store import EmbeddingStore
+from llm_utils.similarity import chunked_search
+
+
+def content_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class DocumentIndex:
+    """
+    Persistent id -> embedding index that only re-embeds changed documents.
+
+    Updated or deleted documents leave their old row behind as a tombstone;
+    search masks tombstones out and compact() rewrites the store with live
+    rows only. `embed` maps a list of texts to a float32 matrix.
+
+    Every upsert or delete stamps the affected ids with an increasing change
+    sequence number, so changes_since() lists what changed after a point
+    without scanning the documents.
+    """
+
+    def __init__(self, path, embed, dtype="float32"):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.embed = embed
+        self.dtype = dtype
+        self._lock = threading.RLock()
+        # Serializes compactions, which mostly run without holding _lock
+        self._compact_lock = threading.Lock()
+        self._compactor = None
+        self._stop = threading.Event()
+
+        self._conn = sqlite3.connect(
+            self.path / "documents.sqlite", check_same_thread=False
+        )
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                row INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                text TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_row ON documents (row);
+            CREATE TABLE IF NOT EXISTS changes (
+                doc_id TEXT PRIMARY KEY,
+                seq INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_changes_seq ON changes (seq);
+            CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+            INSERT OR IGNORE INTO settings VALUES ('generation', '0');
+            INSERT OR IGNORE INTO settings VALUES ('change_seq', '0');
+            """)
+        self._conn.commit()
+        self._open_store()
+
+    def _setting(self, key):
+        (value,) = self._conn.execute(
+            "SELECT value FROM settings WHERE key = ?", (key,)
+        ).fetchone()
+        return int(value)
+
+    def _generation(self):
+        return self._setting("generation")
+
+    def change_seq(self):
+        """Sequence number of the latest upsert or delete"""
+        with self._lock:
+            return self._setting("change_seq")
+
+    def _log_changes(self, doc_ids):
+        """Stamp ids with the next sequence numbers; committed by the caller"""
+        seq = self._setting("change_seq")
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO changes VALUES (?, ?)",
+            [(doc_id, seq + i) for i, doc_id in enumerate(doc_ids, start=1)],
+        )
+        self._conn.execute(
+            "UPDATE settings SET value = ? WHERE key = 'change_seq'",
+            (str(seq + len(doc_ids)),),
+        )
+
+    def changes_since(self, seq, limit=1000):
+        """Up to limit (doc_id, seq) pairs changed after `seq`, oldest first"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT doc_id, seq FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit),
+            ).fetchall()
+
+    def _open_store(self):
+        self.store = EmbeddingStore(
+            self.path / f"store-{self._generation()}", dtype=self.dtype
+        )
+        self.live = np.zeros(len(self.store), dtype=bool)
+        rows = [row for (row,) in self._conn.execute("SELECT row FROM documents")]
+        self.live[rows] = True
+
+    def __len__(self):
+        return int(self.live.sum())
+
+    @property
+    def lock(self):
+        """Re-entrant lock held by every write; hold it to block writers"""
+        return self._lock
+
+    @property
+    def tombstones(self):
+        return len(self.store) - len(self)
+
+    def _select_by_ids(self, columns, doc_ids):
+        """Rows of `columns` for the given ids, queried in SQLite-sized chunks"""
+        results = []
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start : start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            results.extend(
+                self._conn.execute(
+                    f"SELECT {columns} FROM documents WHERE doc_id IN ({placeholders})",
+                    chunk,
+                )
+            )
+        return results
+
+    def hashes(self, doc_ids):
+        """{doc_id: content hash} for the given ids that are in the index"""
+        return dict(self._select_by_ids("doc_id, content_hash", list(doc_ids)))
+
+    def texts(self, doc_ids):
+        """{doc_id: text} for the given ids that are in the index"""
+        with self._lock:
+            return dict(self._select_by_ids("doc_id, text", list(doc_ids)))
+
+    def iter_documents(self, after=None, limit=1000):
+        """Up to limit (doc_id, text) pairs in doc_id order, starting after `after`"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT doc_id, text FROM documents WHERE doc_id > ? "
+                "ORDER BY doc_id LIMIT ?",
+                (after if after is not None else "", limit),
+            ).fetchall()
+
+    def upsert(self, documents):
+        """
+        Add or update documents given as {doc_id: text}.
+
+        Returns (embedded, unchanged) counts; unchanged texts are not embedded.
+        """
+        with self._lock:
+            known = self.hashes(documents)
+            changed = {
+                doc_id: text
+                for doc_id, text in documents.items()
+                if known.get(doc_id) != content_hash(text)
+            }
+            if not changed:
+                return 0, len(documents)
+
+            ids = list(changed)
+            texts = [changed[doc_id] for doc_id in ids]
+            matrix = self.embed(texts)
+
+            first_row = len(self.store)
+            self.store.append(ids, matrix)
+            old_rows = [row for (row,) in self._select_by_ids("row", ids)]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?)",
+                [
+                    (doc_id, first_row + i, content_hash(text), text)
+                    for i, (doc_id, text) in enumerate(zip(ids, texts))
+                ],
+            )
+            self._log_changes(ids)
+            self._conn.commit()
+
+            self.live = np.concatenate([self.live, np.ones(len(ids), dtype=bool)])
+            self.live[old_rows] = False
+            return len(ids), len(documents) - len(ids)
+
+    def delete(self, doc_ids):
+        """Tombstone documents by id; returns how many existed"""
+        with self._lock:
+            doc_ids = list(doc_ids)
+            if not doc_ids:
+                return 0
+            found = self._select_by_ids("doc_id, row", doc_ids)
+            rows = [row for _, row in found]
+            self._conn.executemany(
+                "DELETE FROM documents WHERE doc_id = ?",
+                [(doc_id,) for doc_id in doc_ids],
+            )
+            self._log_changes([doc_id for doc_id, _ in found])
+            self._conn.commit()
+            self.live[rows] = False
+            return len(rows)
+
+    def sync(self, documents):
+        """Make the index match {doc_id: text} exactly: upsert, then delete the rest"""
+        embedded, unchanged = self.upsert(documents)
+        with self._lock:
+            existing = [
+                doc_id
+                for (doc_id,) in self._conn.execute("SELECT doc_id FROM documents")
+            ]
+        deleted = self.delete(doc_id for doc_id in existing if doc_id not in documents)
+        return {"embedded": embedded, "unchanged": unchanged, "deleted": deleted}
+
+    def search(self, query_embeddings, k=10):
+        """Top-k (doc ids, texts, scores) for the first query over live rows"""
+        with self._lock:
+            rows, scores = chunked_search(
+                self.store.vectors, query_embeddings, k=k, row_mask=self.live
+            )
+            found = [
+                (int(row), float(score))
+                for row, score in zip(rows[0], scores[0])
+                if np.isfinite(score)
+            ]
+            if not found:
+                return []
+            placeholders = ",".join("?" * len(found))
+            texts = dict(
+                self._conn.execute(
+                    f"SELECT row, text FROM documents WHERE row IN ({placeholders})",
+                    [row for row, _ in found],
+                )
+            )
+            ids = self.store.ids
+            return [(ids[row], texts[row], score) for row, score in found]
+
+    def compact(self):
+        """
+        Rewrite the store without tombstones and switch to it atomically.
+
+        Live rows are copied to the new store without holding the lock, so
+        reads and writes carry on meanwhile. The lock is only taken to
+        snapshot the live rows and, at the end, to append rows added during
+        the copy, remap rows in SQLite and swap stores. Rows deleted during
+        the copy stay behind as tombstones in the new store.
+        """
+        with self._compact_lock:
+            with self._lock:
+                if self.tombstones == 0:
+                    return 0
+                generation = self._generation() + 1
+                snapshot_rows = np.flatnonzero(self.live)
+                snapshot_count = len(self.store)
+                store_path = self.store.path
+
+            # A separate reader over the append-only store: rows that existed
+            # at the snapshot never change, whatever writers append meanwhile
+            reader = EmbeddingStore(store_path, dtype=self.dtype)
+            vectors, ids = reader.vectors, reader.ids
+            new_path = self.path / f"store-{generation}"
+            if new_path.exists():
+                shutil.rmtree(new_path)
+            new_store = EmbeddingStore(new_path, dtype=self.dtype)
+            for start in range(0, snapshot_rows.size, 65536):
+                rows = snapshot_rows[start : start + 65536]
+                new_store.append([ids[row] for row in rows], vectors[rows])
+
+            with self._lock:
+                old_count = len(self.store)
+                # Live rows written during the copy; their ids come from SQLite
+                # so the store's id list is not parsed under the lock
+                added = self._conn.execute(
+                    "SELECT row, doc_id FROM documents WHERE row >= ? ORDER BY row",
+                    (snapshot_count,),
+                ).fetchall()
+                added_rows = np.array([row for row, _ in added], dtype=np.int64)
+                if added:
+                    new_store.append(
+                        [doc_id for _, doc_id in added],
+                        self.store.vectors[added_rows],
+                    )
+
+                # Old row -> position in the new store, applied in one UPDATE
+                copied = np.concatenate([snapshot_rows, added_rows])
+                self._conn.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS row_map "
+                    "(old INTEGER PRIMARY KEY, new INTEGER NOT NULL)"
+                )
+                self._conn.execute("DELETE FROM row_map")
+                self._conn.executemany(
+                    "INSERT INTO row_map VALUES (?, ?)",
+                    zip(copied.tolist(), range(copied.size)),
+                )
+                self._conn.execute(
+                    "UPDATE documents SET row = "
+                    "(SELECT new FROM row_map WHERE old = documents.row)"
+                )
+                self._conn.execute("DELETE FROM row_map")
+                self._conn.execute(
+                    "UPDATE settings SET value = ? WHERE key = 'generation'",
+                    (str(generation),),
+                )
+                self._conn.commit()
+
+                old_path = self.store.path
+                self._open_store()
+                shutil.rmtree(old_path, ignore_errors=True)
+                return old_count - len(self.store)
+
+    def start_background_compaction(self, interval=60.0, min_tombstone_ratio=0.2):
+        """Compact from a daemon thread whenever tombstones pass the ratio"""
+
+        def run():
+            while not self._stop.wait(interval):
+                if (
+                    len(self.store)
+                    and self.tombstones / len(self.store) >= min_tombstone_ratio
+                ):
+                    self.compact()
+
+        self._stop.clear()
+        self._compactor = threading.Thread(target=run, daemon=True)
+        self._compactor.start()
+
+    def close(self):
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        with self._lock:
+            self._conn.close()
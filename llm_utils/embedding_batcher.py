@@ -0,0 +1,293 @@
+"""
+LLM Bootcamp OpenAI Demo - Embedding Batcher
+Token-aware request batching with concurrent dispatch for the embeddings API
+
+Run directly to compare the SDK's default decoding with base64 + np.frombuffer:
+    python -m llm_utils.embedding_batcher --vectors 10000 --dim 1536
+"""
+
+import argparse
+import base64
+import json
+import math
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Per-request limits of POST /v1/embeddings
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300_000
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return max(1, math.ceil(len(text) / 4))
+
+
+def make_batches(
+    texts,
+    max_items=MAX_INPUTS_PER_REQUEST,
+    max_tokens=MAX_TOKENS_PER_REQUEST,
+    token_counter=estimate_tokens,
+):
+    """Split texts into (start, end) ranges that fit in one request each"""
+    batches = []
+    start = 0
+    tokens = 0
+    for i, text in enumerate(texts):
+        text_tokens = token_counter(text)
+        if i > start and (i - start >= max_items or tokens + text_tokens > max_tokens):
+            batches.append((start, i))
+            start = i
+            tokens = 0
+        tokens += text_tokens
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+def decode_embeddings(embeddings):
+    """
+    Float32 (n, dim) matrix from a list of embeddings in either wire format.
+
+    base64 payloads (encoding_format="base64") are decoded with np.frombuffer
+    straight into a preallocated matrix, so no Python floats are ever built.
+    """
+    if not embeddings:
+        return np.empty((0, 0), dtype=np.float32)
+    if not isinstance(embeddings[0], str):
+        return np.array(embeddings, dtype=np.float32)
+
+    first = np.frombuffer(base64.b64decode(embeddings[0]), dtype=np.float32)
+    matrix = np.empty((len(embeddings), first.shape[0]), dtype=np.float32)
+    matrix[0] = first
+    for i, encoded in enumerate(embeddings[1:], 1):
+        matrix[i] = np.frombuffer(base64.b64decode(encoded), dtype=np.float32)
+    return matrix
+
+
+def response_to_matrix(response):
+    """Float32 (n, dim) matrix from an embeddings response, in input order"""
+    data = sorted(response.data, key=lambda item: item.index)
+    return decode_embeddings([item.embedding for item in data])
+
+
+class BatchEmbedder:
+    """Embeds arbitrarily long text lists through a bounded pool of requests"""
+
+    def __init__(
+        self,
+        client,
+        max_workers=4,
+        max_items=MAX_INPUTS_PER_REQUEST,
+        max_tokens=MAX_TOKENS_PER_REQUEST,
+        token_counter=estimate_tokens,
+        encoding_format="base64",
+    ):
+        self.client = client
+        self.encoding_format = encoding_format
+        self.max_workers = max_workers
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.texts = 0
+        self.tokens = 0
+        self.elapsed = 0.0
+
+    def _embed_batch(self, texts, model, create_kwargs):
+        if self.encoding_format is not None:
+            create_kwargs = {"encoding_format": self.encoding_format, **create_kwargs}
+        response = self.client.embeddings.create(
+            model=model, input=texts, **create_kwargs
+        )
+        return response_to_matrix(response), response.usage.prompt_tokens
+
+    def embed(self, texts, model, **create_kwargs):
+        """
+        Embed texts in request-sized chunks, dispatched concurrently.
+
+        Returns a (len(texts), dim) float32 matrix in input order and a usage
+        dict aggregated over every request that was made.
+        """
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32), {"prompt_tokens": 0}
+
+        batches = make_batches(
+            texts, self.max_items, self.max_tokens, self.token_counter
+        )
+        start = time.perf_counter()
+
+        if len(batches) == 1:
+            results = [self._embed_batch(texts, model, create_kwargs)]
+        else:
+            workers = min(self.max_workers, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # map() yields in submission order, so rows stay aligned
+                results = list(
+                    pool.map(
+                        lambda bounds: self._embed_batch(
+                            texts[bounds[0] : bounds[1]], model, create_kwargs
+                        ),
+                        batches,
+                    )
+                )
+
+        elapsed = time.perf_counter() - start
+        matrix = np.vstack([rows for rows, _ in results])
+        prompt_tokens = sum(tokens for _, tokens in results)
+
+        with self._lock:
+            self.requests += len(batches)
+            self.texts += len(texts)
+            self.tokens += prompt_tokens
+            self.elapsed += elapsed
+
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "total_tokens": prompt_tokens,
+            "requests": len(batches),
+        }
+        return matrix, usage
+
+    def stats(self):
+        """Cumulative throughput counters"""
+        with self._lock:
+            elapsed = self.elapsed
+            return {
+                "requests": self.requests,
+                "texts": self.texts,
+                "tokens": self.tokens,
+                "elapsed": elapsed,
+                "texts_per_s": self.texts / elapsed if elapsed else 0.0,
+                "tokens_per_s": self.tokens / elapsed if elapsed else 0.0,
+            }
+
+
+def benchmark_decoding(n_vectors=10_000, dim=1536, seed=0):
+    """
+    Decode time and peak memory of the SDK's default embeddings path versus
+    base64 with np.frombuffer.
+
+    Both go through a real OpenAI client whose HTTP transport serves canned
+    responses, so SDK parsing is included but the network is not. The SDK
+    default, the repo's previous path, returns Python float lists that are
+    then copied into a matrix with np.array. Each result's "wire" is the
+    encoding_format the SDK put in the request it sent.
+    """
+    import httpx
+    from openai import OpenAI
+
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n_vectors, dim)).astype(np.float32)
+
+    def body(encode):
+        return json.dumps(
+            {
+                "object": "list",
+                "data": [
+                    {"object": "embedding", "index": i, "embedding": encode(v)}
+                    for i, v in enumerate(vectors)
+                ],
+                "model": "benchmark",
+                "usage": {"prompt_tokens": n_vectors, "total_tokens": n_vectors},
+            }
+        ).encode()
+
+    encoders = {
+        "float": lambda v: v.tolist(),
+        "base64": lambda v: base64.b64encode(v.tobytes()).decode(),
+    }
+    # Bodies are built on first request, only for the formats actually asked for
+    bodies = {}
+    requested = []
+
+    def handler(request):
+        encoding = json.loads(request.content).get("encoding_format", "float")
+        requested.append(encoding)
+        if encoding not in bodies:
+            bodies[encoding] = body(encoders[encoding])
+        return httpx.Response(
+            200,
+            content=bodies[encoding],
+            headers={"content-type": "application/json"},
+        )
+
+    client = OpenAI(
+        api_key="benchmark",
+        base_url="http://benchmark.invalid/v1",
+        http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        max_retries=0,
+    )
+    texts = ["x"] * n_vectors
+
+    def sdk_default():
+        response = client.embeddings.create(model="benchmark", input=texts)
+        return np.array([item.embedding for item in response.data], dtype=np.float32)
+
+    def base64_frombuffer():
+        response = client.embeddings.create(
+            model="benchmark", input=texts, encoding_format="base64"
+        )
+        return response_to_matrix(response)
+
+    paths = [
+        ("sdk float lists", sdk_default),
+        ("base64 frombuffer", base64_frombuffer),
+    ]
+    results = []
+    for name, decode in paths:
+        requested.clear()
+        start = time.perf_counter()
+        matrix = decode()
+        elapsed = time.perf_counter() - start
+        # The wire format is whatever encoding_format the SDK actually sent
+        wire = requested[-1]
+
+        # Memory is measured on a second run since tracing slows parsing down
+        tracemalloc.start()
+        decode()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if not np.array_equal(matrix, vectors):
+            raise ValueError(f"{name} decoding did not round-trip")
+        results.append(
+            {
+                "path": name,
+                "wire": wire,
+                "body_mb": len(bodies[wire]) / 1e6,
+                "parse_s": elapsed,
+                "peak_mb": peak / 1e6,
+            }
+        )
+
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the SDK's default embedding decoding with base64 + np.frombuffer"
+    )
+    parser.add_argument("--vectors", type=int, default=10_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    print(f"=== Embedding Decoding Benchmark ===")
+    print(f"Vectors: {args.vectors} x {args.dim}")
+    for row in benchmark_decoding(args.vectors, args.dim):
+        print(
+            f"{row['path']:>17} | wire: {row['wire']:>6} | "
+            f"body: {row['body_mb']:.1f}MB | "
+            f"parse: {row['parse_s']:.2f}s | peak memory: {row['peak_mb']:.1f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
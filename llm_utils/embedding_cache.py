@@ -0,0 +1,200 @@
+"""
+LLM Bootcamp OpenAI Demo - Embedding Cache
+Persistent, content-addressed cache for embedding vectors (SQLite + float32 blobs)
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+
+import numpy as np
+
+from llm_utils.embedding_batcher import response_to_matrix
+
+
+def normalize_text(text):
+    """Normalize text so trivially different inputs share one cache entry"""
+    text = unicodedata.normalize("NFC", text)
+    return " ".join(text.split())
+
+
+def cache_key(model, text):
+    """Content address for a (model, normalized text) pair"""
+    payload = f"{model}\x00{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache with an entry cap and LRU eviction.
+
+    The row count is read once on open and then tracked in memory, so writes
+    never scan the table; it assumes one writer process per cache file.
+    """
+
+    def __init__(self, path="embedding_cache.sqlite", max_entries=1_000_000):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings (last_access)"
+        )
+        self._conn.commit()
+        (self._count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM embeddings"
+        ).fetchone()
+
+    def get_many(self, model, texts):
+        """Return a float32 vector per text, or None where the cache has no entry"""
+        keys = [cache_key(model, text) for text in texts]
+        found = {}
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique_keys), 500):
+                chunk = unique_keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for vector in results if vector is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        return results
+
+    def put_many(self, model, texts, vectors):
+        """Store vectors for texts, evicting least recently used entries past the cap"""
+        now = time.time()
+        rows = {}
+        for text, vector in zip(texts, vectors):
+            vector = np.asarray(vector, dtype=np.float32)
+            key = cache_key(model, text)
+            rows[key] = (key, model, vector.shape[0], vector.tobytes(), now)
+
+        with self._lock:
+            # Replaced keys don't change the row count; look them up by key
+            keys = list(rows)
+            existing = 0
+            for start in range(0, len(keys), 500):
+                chunk = keys[start : start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                (found,) = self._conn.execute(
+                    f"SELECT COUNT(*) FROM embeddings WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchone()
+                existing += found
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(key, model, dim, vector, last_access) VALUES (?, ?, ?, ?, ?)",
+                list(rows.values()),
+            )
+            self._count += len(rows) - existing
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop the oldest entries until the cache is within max_entries"""
+        if self.max_entries is None:
+            return
+        overflow = self._count - self.max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._count -= cursor.rowcount
+            self.evictions += cursor.rowcount
+
+    def __len__(self):
+        with self._lock:
+            return self._count
+
+    def stats(self):
+        """Hit/miss counters for reporting"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def embed_with_cache(client, texts, model, cache=None, batcher=None, **create_kwargs):
+    """
+    Embed texts, sending only cache misses to the API.
+
+    Misses go through `batcher` (a BatchEmbedder) when one is given, otherwise
+    as a single request. Returns a (len(texts), dim) float32 matrix and the
+    API usage (None when every text was served from cache).
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32), None
+
+    def embed(batch):
+        if batcher is not None:
+            return batcher.embed(batch, model, **create_kwargs)
+        response = client.embeddings.create(model=model, input=batch, **create_kwargs)
+        return response_to_matrix(response), response.usage
+
+    if cache is None:
+        return embed(texts)
+
+    # Shortened vectors must not be served for full-size requests
+    cache_model = model
+    if create_kwargs.get("dimensions"):
+        cache_model = f"{model}@{create_kwargs['dimensions']}"
+    cached = cache.get_many(cache_model, texts)
+
+    # Deduplicate misses so repeated texts are only embedded once
+    miss_positions = {}
+    for i, (text, vector) in enumerate(zip(texts, cached)):
+        if vector is None:
+            miss_positions.setdefault(cache_key(cache_model, text), []).append(i)
+
+    usage = None
+    if miss_positions:
+        miss_texts = [texts[positions[0]] for positions in miss_positions.values()]
+        fresh, usage = embed(miss_texts)
+        cache.put_many(cache_model, miss_texts, fresh)
+        for positions, vector in zip(miss_positions.values(), fresh):
+            for i in positions:
+                cached[i] = vector
+
+    return np.vstack(cached), usage
@@ -0,0 +1,137 @@
+"""
+LLM Bootcamp OpenAI Demo - Embedding Store
+Append-only columnar vector file opened with np.memmap for zero-copy reads
+"""
+
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from llm_utils.similarity import chunked_search
+
+
+class EmbeddingStore:
+    """
+    Embeddings on disk as one raw row-major float32/float16 file.
+
+    Layout of the store directory:
+        meta.json    - dim, dtype and the committed row count / ids byte offset
+        vectors.bin  - rows of `dim` values, appended in order
+        ids.jsonl    - one JSON-encoded id per line; line number == row
+    Readers map vectors.bin with np.memmap, so opening is instant and the page
+    cache is shared between every process reading the same store. Appends
+    assume a single writer.
+    """
+
+    def __init__(self, path, dim=None, dtype="float32"):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        self.ids_bytes = 0
+
+        if self.meta_path.exists():
+            meta = json.loads(self.meta_path.read_text())
+            self.dim = meta["dim"]
+            self.dtype = np.dtype(meta["dtype"])
+            self.count = meta["count"]
+            self.ids_bytes = meta["ids_bytes"]
+
+        self._ids = None
+        self._vectors = None
+
+    @property
+    def meta_path(self):
+        return self.path / "meta.json"
+
+    @property
+    def vectors_path(self):
+        return self.path / "vectors.bin"
+
+    @property
+    def ids_path(self):
+        return self.path / "ids.jsonl"
+
+    def __len__(self):
+        return self.count
+
+    def _commit(self):
+        """Atomically record the new row count; uncommitted bytes are ignored"""
+        tmp_path = self.meta_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "dim": self.dim,
+                    "dtype": self.dtype.name,
+                    "count": self.count,
+                    "ids_bytes": self.ids_bytes,
+                }
+            )
+        )
+        os.replace(tmp_path, self.meta_path)
+
+    def append(self, ids, embeddings):
+        """Append one row per id"""
+        matrix = np.asarray(embeddings, dtype=self.dtype)
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError("Expected one embedding row per id")
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected dimension {self.dim}, got {matrix.shape[1]}")
+
+        encoded = "".join(json.dumps(i) + "\n" for i in ids).encode("utf-8")
+        row_bytes = self.dim * self.dtype.itemsize
+
+        # Drop anything an interrupted append left past the committed offsets
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(self.count * row_bytes)
+            f.write(np.ascontiguousarray(matrix).tobytes())
+        with open(self.ids_path, "ab") as f:
+            f.truncate(self.ids_bytes)
+            f.write(encoded)
+
+        self.count += matrix.shape[0]
+        self.ids_bytes += len(encoded)
+        self._commit()
+
+        # Invalidate views so the next read sees the new rows
+        self._ids = None
+        self._vectors = None
+
+    @property
+    def vectors(self):
+        """Read-only (n, dim) memmap over the committed rows"""
+        if self._vectors is None:
+            if self.count == 0:
+                return np.empty((0, self.dim or 0), dtype=self.dtype)
+            self._vectors = np.memmap(
+                self.vectors_path,
+                dtype=self.dtype,
+                mode="r",
+                shape=(self.count, self.dim),
+            )
+        return self._vectors
+
+    @property
+    def ids(self):
+        """Stored ids in row order"""
+        if self._ids is None:
+            if self.count == 0:
+                self._ids = []
+            else:
+                with open(self.ids_path, "rb") as f:
+                    data = f.read(self.ids_bytes)
+                self._ids = [json.loads(line) for line in data.splitlines()]
+        return self._ids
+
+    def search(self, query_embeddings, k=10, chunk_size=65536):
+        """Exact top-k (ids, scores) per query, streamed over the memmap"""
+        rows, scores = chunked_search(
+            self.vectors, query_embeddings, k=k, chunk_size=chunk_size
+        )
+        ids = self.ids
+        return [[ids[row] for row in query_rows] for query_rows in rows], scores
@@ -0,0 +1,211 @@
+"""
+LLM Bootcamp OpenAI Demo - Hedged Requests
+Sends a duplicate request when the first one is slower than a percentile of
+observed latency, keeps whichever finishes first and cancels the other
+"""
+
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+
+import numpy as np
+
+
+class HedgePolicy:
+    """
+    When to hedge, and how often it is allowed.
+
+    The hedge delay is the `percentile` of the last `window` attempt
+    latencies (`initial_delay` until `min_samples` are seen). At most
+    `max_hedge_ratio` of requests may be hedged, so a slow API cannot double
+    the load on it.
+    """
+
+    def __init__(
+        self,
+        percentile=95,
+        max_hedge_ratio=0.05,
+        initial_delay=2.0,
+        min_samples=20,
+        window=1000,
+        max_workers=32,
+    ):
+        self.percentile = percentile
+        self.max_hedge_ratio = max_hedge_ratio
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.hedges_issued = 0
+        self.hedges_won = 0
+        self.hedges_denied = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self._max_workers = max_workers
+
+    @property
+    def executor(self):
+        """Thread pool for the synchronous path, created on first use"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+            return self._executor
+
+    def delay(self):
+        with self._lock:
+            if len(self.latencies) < self.min_samples:
+                return self.initial_delay
+            return float(np.percentile(self.latencies, self.percentile))
+
+    def record(self, latency):
+        with self._lock:
+            self.latencies.append(latency)
+
+    def start_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def allow_hedge(self):
+        """Reserve a hedge if the budget has room"""
+        with self._lock:
+            if self.hedges_issued + 1 > self.max_hedge_ratio * self.requests:
+                self.hedges_denied += 1
+                return False
+            self.hedges_issued += 1
+            return True
+
+    def record_win(self):
+        with self._lock:
+            self.hedges_won += 1
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "hedges_issued": self.hedges_issued,
+            "hedges_won": self.hedges_won,
+            "hedges_denied": self.hedges_denied,
+            "hedge_rate": self.hedges_issued / self.requests if self.requests else 0.0,
+            "delay": self.delay(),
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def _pick_winner(done, primary):
+    """First successful attempt (primary on ties), or None if all failed"""
+    ordered = sorted(done, key=lambda attempt: attempt is not primary)
+    return next((attempt for attempt in ordered if attempt.exception() is None), None)
+
+
+def hedged_call(policy, call, discard=None):
+    """
+    Run call() with hedging on the policy's thread pool.
+
+    A synchronous HTTP call cannot be aborted mid-flight, so a losing attempt
+    that already started runs to completion; its result is passed to
+    discard() (e.g. to close a stream) and dropped. Errors are not retried:
+    a primary that fails before the hedge delay raises immediately.
+    """
+    policy.start_request()
+
+    def attempt():
+        start = time.perf_counter()
+        result = call()
+        policy.record(time.perf_counter() - start)
+        return result
+
+    def release(future):
+        if discard is not None and not future.cancelled() and not future.exception():
+            discard(future.result())
+
+    primary = policy.executor.submit(attempt)
+    try:
+        return primary.result(timeout=policy.delay())
+    except FutureTimeoutError:
+        pass
+    if not policy.allow_hedge():
+        return primary.result()
+
+    hedge = policy.executor.submit(attempt)
+    pending = {primary, hedge}
+    winner = None
+    while pending and winner is None:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        winner = _pick_winner(done, primary)
+    if winner is None:
+        return primary.result()  # both failed: raise the primary's error
+
+    if winner is hedge:
+        policy.record_win()
+    for loser in {primary, hedge} - {winner}:
+        loser.cancel()
+        loser.add_done_callback(release)
+    return winner.result()
+
+
+def hedged_stream(policy, create):
+    """
+    Hedge a streaming request on its first chunk.
+
+    create() opens a stream. Returns an iterator over the winning stream's
+    chunks; the losing stream is closed as soon as it is available.
+    """
+
+    def open_stream():
+        stream = create()
+        chunks = iter(stream)
+        return stream, chunks, next(chunks, None)
+
+    _, chunks, first = hedged_call(
+        policy, open_stream, discard=lambda opened: opened[0].close()
+    )
+    if first is None:
+        return iter(())
+    return itertools.chain([first], chunks)
+
+
+async def ahedged_call(policy, call):
+    """
+    hedged_call for coroutines: call() returns an awaitable, and the losing
+    attempt is cancelled, which aborts its HTTP request.
+    """
+    policy.start_request()
+
+    async def attempt():
+        start = time.perf_counter()
+        result = await call()
+        policy.record(time.perf_counter() - start)
+        return result
+
+    primary = asyncio.ensure_future(attempt())
+    pending = {primary}
+    try:
+        done, _ = await asyncio.wait(pending, timeout=policy.delay())
+        if done or not policy.allow_hedge():
+            return await primary
+
+        hedge = asyncio.ensure_future(attempt())
+        pending.add(hedge)
+        winner = None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            winner = _pick_winner(done, primary)
+        if winner is None:
+            return primary.result()
+
+        if winner is hedge:
+            policy.record_win()
+        return winner.result()
+    finally:
+        # Cancel the loser, or both attempts if the caller was cancelled
+        for attempt_task in pending:
+            attempt_task.cancel()
@@ -0,0 +1,194 @@
+"""
+LLM Bootcamp OpenAI Demo - Streaming Metrics
+In-process histogram registry (JSON / Prometheus text export) and a per-request
+timer for connect time, time-to-first-token and inter-token gaps
+"""
+
+import json
+import random
+import threading
+import time
+
+import numpy as np
+
+# Seconds; spans sub-millisecond token gaps up to minute-long generations
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+RATE_BUCKETS = (1, 5, 10, 25, 50, 100, 200, 400, 800)
+COUNT_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2000, 4000)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram that also keeps a uniform reservoir of up to
+    `max_samples` observations for percentiles.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, max_samples=10_000):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max_samples = max_samples
+        self.samples = []
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[np.searchsorted(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            if len(self.samples) < self.max_samples:
+                self.samples.append(value)
+            else:
+                slot = random.randrange(self.count)
+                if slot < self.max_samples:
+                    self.samples[slot] = value
+
+    def percentile(self, q):
+        with self._lock:
+            return float(np.percentile(self.samples, q)) if self.samples else 0.0
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": dict(zip([str(b) for b in self.buckets], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """Histograms keyed by metric name and label set"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, buckets=LATENCY_BUCKETS, description="", **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._metrics:
+                self._metrics[key] = Histogram(buckets)
+                self._help.setdefault(name, description)
+            return self._metrics[key]
+
+    def to_json(self):
+        result = {}
+        for (name, labels), histogram in sorted(self._metrics.items()):
+            entry = histogram.snapshot()
+            entry["labels"] = dict(labels)
+            result.setdefault(name, []).append(entry)
+        return json.dumps(result, indent=2)
+
+    def to_prometheus(self):
+        lines = []
+        for name in sorted({name for name, _ in self._metrics}):
+            if self._help.get(name):
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), histogram in sorted(self._metrics.items()):
+                if metric != name:
+                    continue
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                prefix = label_text + "," if label_text else ""
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+                suffix = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{name}_sum{suffix} {histogram.sum}")
+                lines.append(f"{name}_count{suffix} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+default_registry = MetricsRegistry()
+
+
+class StreamTimer:
+    """
+    Times one streamed request; doubles as a stream sink.
+
+    Create it right before the API call, call connected() once the call
+    returns the stream, and pass it to consume_stream with the other sinks.
+    Each content chunk counts as one token (the API streams about one token
+    per chunk). Observations are recorded on close().
+    """
+
+    def __init__(self, registry=default_registry, **labels):
+        self.registry = registry
+        self.labels = labels
+        self.start = time.perf_counter()
+        self.connect = None
+        self.first_token = None
+        self.last_token = None
+        self.gaps = []
+        self.tokens = 0
+
+    def connected(self):
+        self.connect = time.perf_counter() - self.start
+
+    def write(self, delta):
+        now = time.perf_counter()
+        if self.first_token is None:
+            self.first_token = now - self.start
+        else:
+            self.gaps.append(now - self.last_token)
+        self.last_token = now
+        self.tokens += 1
+
+    def close(self):
+        registry, labels = self.registry, self.labels
+        total = time.perf_counter() - self.start
+        if self.connect is not None:
+            registry.histogram(
+                "llm_stream_connect_seconds",
+                description="Time until the streaming response started",
+                **labels,
+            ).observe(self.connect)
+        if self.first_token is not None:
+            registry.histogram(
+                "llm_stream_ttft_seconds", description="Time to first token", **labels
+            ).observe(self.first_token)
+        gaps = registry.histogram(
+            "llm_stream_inter_token_seconds",
+            description="Gap between consecutive content chunks",
+            **labels,
+        )
+        for gap in self.gaps:
+            gaps.observe(gap)
+        registry.histogram(
+            "llm_stream_total_seconds", description="Whole request duration", **labels
+        ).observe(total)
+        registry.histogram(
+            "llm_stream_tokens",
+            buckets=COUNT_BUCKETS,
+            description="Content chunks per response",
+            **labels,
+        ).observe(self.tokens)
+        if self.tokens and self.first_token is not None and total > self.first_token:
+            registry.histogram(
+                "llm_stream_tokens_per_second",
+                buckets=RATE_BUCKETS,
+                description="Generation rate after the first token",
+                **labels,
+            ).observe(self.tokens / (total - self.first_token))
@@ -0,0 +1,188 @@
+"""
+LLM Bootcamp OpenAI Demo - Embedding Model Migration
+Re-embeds a DocumentIndex into a shadow index in rate-limited background
+batches, checkpointing progress, then switches readers over atomically
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from llm_utils.document_index import DocumentIndex
+
+ACTIVE_FILE = "active.json"
+
+
+def read_active(root):
+    """(index path, model) readers should use, or (root, None) before any migration"""
+    root = Path(root)
+    active_path = root / ACTIVE_FILE
+    if not active_path.exists():
+        return root, None
+    active = json.loads(active_path.read_text())
+    return root / active["path"], active["model"]
+
+
+def set_active(root, path, model):
+    """Point readers at another index in a single atomic rename"""
+    root = Path(root)
+    tmp_path = root / f"{ACTIVE_FILE}.tmp"
+    tmp_path.write_text(
+        json.dumps({"path": str(Path(path).relative_to(root)), "model": model})
+    )
+    os.replace(tmp_path, root / ACTIVE_FILE)
+
+
+class EmbeddingMigration:
+    """
+    Copies every document of `source` into a shadow index embedded by `embed`.
+
+    The source keeps serving throughout. Progress (a doc_id cursor and the
+    source's change sequence number at the start) is saved to migration.json
+    in the shadow directory after each batch, so a restarted migration
+    resumes where it stopped. Once the shadow covers every source document,
+    documents changed since the start are re-synced from the source's change
+    log until less than a batch is left; only that final delta is applied
+    under the source's write lock before the active pointer is switched.
+    The shadow index is closed after the switch; call close() to release it
+    when a migration is abandoned before that.
+    """
+
+    def __init__(
+        self,
+        root,
+        source,
+        target_model,
+        embed,
+        batch_size=256,
+        requests_per_minute=60,
+    ):
+        self.root = Path(root)
+        self.source = source
+        self.target_model = target_model
+        self.batch_size = batch_size
+        self.min_interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.shadow_path = self.root / f"index-{target_model}"
+        self.shadow = DocumentIndex(self.shadow_path, embed)
+        self.checkpoint_path = self.shadow_path / "migration.json"
+        self.checkpoint = {
+            "cursor": None,
+            "copied": 0,
+            "switched": False,
+            # Changes logged after this are re-synced once the copy is done
+            "change_seq": source.change_seq(),
+        }
+        if self.checkpoint_path.exists():
+            self.checkpoint = json.loads(self.checkpoint_path.read_text())
+            # Checkpoints written before the change log re-check every change
+            self.checkpoint.setdefault("change_seq", 0)
+        self._last_request = 0.0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _save_checkpoint(self):
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.checkpoint))
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _throttle(self):
+        wait = self._last_request + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
+
+    def coverage(self):
+        """Fraction of source documents present in the shadow index"""
+        return (
+            min(1.0, len(self.shadow) / len(self.source)) if len(self.source) else 1.0
+        )
+
+    def _copy(self, documents):
+        """Embed the documents whose text differs from (or is missing in) the shadow"""
+        ids = list(documents)
+        if self.shadow.hashes(ids) != self.source.hashes(ids):
+            self._throttle()
+            self.shadow.upsert(documents)
+
+    def step(self):
+        """Migrate one batch; returns False once the cursor has passed every document"""
+        batch = self.source.iter_documents(self.checkpoint["cursor"], self.batch_size)
+        if not batch:
+            return False
+        self._copy(dict(batch))
+        self.checkpoint["cursor"] = batch[-1][0]
+        self.checkpoint["copied"] += len(batch)
+        self._save_checkpoint()
+        return True
+
+    def _catch_up(self, final=False):
+        """
+        Re-sync documents edited or deleted in the source since the checkpoint.
+
+        Stops after the first batch smaller than batch_size, or, when final,
+        once no change is left.
+        """
+        while True:
+            changes = self.source.changes_since(
+                self.checkpoint["change_seq"], self.batch_size
+            )
+            if not changes:
+                return
+            ids = [doc_id for doc_id, _ in changes]
+            documents = self.source.texts(ids)
+            if documents:
+                self._copy(documents)
+            self.shadow.delete(doc_id for doc_id in ids if doc_id not in documents)
+            self.checkpoint["change_seq"] = changes[-1][1]
+            self._save_checkpoint()
+            if not final and len(changes) < self.batch_size:
+                return
+
+    def run(self):
+        """Migrate until complete (or stopped), then switch readers to the shadow"""
+        while not self._stop.is_set() and self.step():
+            pass
+        if self._stop.is_set():
+            return False
+
+        # Writers keep going while the bulk of the changes is caught up
+        self._catch_up()
+        self.shadow.compact()
+        # Hold the source's write lock only for the last small delta and switch
+        with self.source.lock:
+            self._catch_up(final=True)
+            set_active(self.root, self.shadow_path, self.target_model)
+        self.checkpoint["switched"] = True
+        self._save_checkpoint()
+        # Readers open the shadow by path from now on; don't keep a second handle
+        self.shadow.close()
+        return True
+
+    def start(self):
+        """Run the migration on a background thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """Pause after the current batch; progress is kept in the checkpoint"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        """Stop the migration and close the shadow index"""
+        self.stop()
+        if not self.checkpoint["switched"]:
+            self.shadow.close()
+
+    def stats(self):
+        return {
+            "target_model": self.target_model,
+            "copied": self.checkpoint["copied"],
+            "coverage": self.coverage(),
+            "switched": self.checkpoint["switched"],
+        }
@@ -0,0 +1,156 @@
+"""
+LLM Bootcamp OpenAI Demo - Mock OpenAI Endpoint
+Local stand-in for POST /v1/chat/completions (plain and streamed) with
+configurable latency, for load tests that must not spend quota
+
+Point a client at it with OpenAI(base_url="http://127.0.0.1:<port>/v1", api_key="mock"):
+    python -m llm_utils.mock_openai --port 8001 --ttft 0.2 --tokens 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from llm_utils.chat_server import read_request, send_json, start_sse
+
+WORDS = "the quick brown fox jumps over the lazy dog while models stream tokens".split()
+
+
+class MockOpenAI:
+    """
+    Answers chat completions with `tokens` words after `ttft` seconds,
+    spacing streamed chunks `inter_token` seconds apart.
+    """
+
+    def __init__(
+        self, host="127.0.0.1", port=8001, ttft=0.2, inter_token=0.01, tokens=50
+    ):
+        self.host = host
+        self.port = port
+        self.ttft = ttft
+        self.inter_token = inter_token
+        self.tokens = tokens
+        self.requests = 0
+        self.server = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                if request.method != "POST" or request.path != "/v1/chat/completions":
+                    await send_json(writer, 404, {"error": {"message": "not found"}})
+                    continue
+                self.requests += 1
+                body = request.json()
+                if body.get("stream"):
+                    await self._stream(body, writer)
+                    break
+                await self._complete(body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _reply_words(self, body):
+        count = min(self.tokens, body.get("max_tokens") or self.tokens)
+        return [WORDS[i % len(WORDS)] + " " for i in range(count)]
+
+    def _prompt_tokens(self, body):
+        text = " ".join(str(m.get("content", "")) for m in body.get("messages", []))
+        return max(1, len(text) // 4)
+
+    async def _complete(self, body, writer):
+        words = self._reply_words(body)
+        await asyncio.sleep(self.ttft + self.inter_token * len(words))
+        prompt_tokens = self._prompt_tokens(body)
+        await send_json(
+            writer,
+            200,
+            {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "".join(words)},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(words),
+                    "total_tokens": prompt_tokens + len(words),
+                },
+            },
+        )
+
+    async def _stream(self, body, writer):
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        async def send(delta, finish_reason=None):
+            chunk = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+            writer.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            await writer.drain()
+
+        await start_sse(writer)
+        await asyncio.sleep(self.ttft)
+        await send({"role": "assistant", "content": ""})
+        for i, word in enumerate(self._reply_words(body)):
+            if i:
+                await asyncio.sleep(self.inter_token)
+            await send({"content": word})
+        await send({}, finish_reason="stop")
+        writer.write(b"data: [DONE]\n\n")
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock chat completions API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ttft", type=float, default=0.2)
+    parser.add_argument("--inter-token", type=float, default=0.01)
+    parser.add_argument("--tokens", type=int, default=50)
+    args = parser.parse_args()
+
+    async def serve():
+        mock = MockOpenAI(
+            args.host, args.port, args.ttft, args.inter_token, args.tokens
+        )
+        server = await mock.start()
+        print(f"Mock OpenAI listening on {mock.base_url}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
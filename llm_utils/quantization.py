@@ -0,0 +1,158 @@
+"""
+LLM Bootcamp OpenAI Demo - Quantized Vector Search
+int8 (scalar) and binary (sign-bit) codes for coarse search, re-ranked exactly
+against full-precision vectors loaded on demand
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from llm_utils.similarity import chunked_search, normalize_rows, top_k_indices
+
+MODES = ("int8", "binary")
+
+# Set-bit count for every byte value, used for Hamming distances
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(codes):
+    """Number of set bits per row of a packed uint8 matrix"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(codes).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT[codes].sum(axis=1, dtype=np.int32)
+
+
+class QuantizedIndex:
+    """
+    Compact codes for a (possibly memory-mapped) embedding matrix.
+
+    mode="int8" stores one byte per dimension with a per-dimension scale
+    (4x smaller than float32); mode="binary" keeps only the sign bit of each
+    dimension (32x smaller) and ranks by Hamming distance.
+    """
+
+    def __init__(self, codes, mode, scale=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        self.codes = codes
+        self.mode = mode
+        self.scale = scale
+
+    @classmethod
+    def build(cls, vectors, mode="int8", chunk_size=65536):
+        """Quantize normalized rows chunk by chunk"""
+        n = vectors.shape[0]
+        if mode == "binary":
+            codes = np.empty((n, (vectors.shape[1] + 7) // 8), dtype=np.uint8)
+            for start in range(0, n, chunk_size):
+                chunk = vectors[start : start + chunk_size]
+                codes[start : start + chunk_size] = np.packbits(chunk > 0, axis=1)
+            return cls(codes, mode)
+
+        # First pass finds the per-dimension range, second pass quantizes
+        absmax = np.zeros(vectors.shape[1], dtype=np.float32)
+        for start in range(0, n, chunk_size):
+            chunk = normalize_rows(vectors[start : start + chunk_size])
+            np.maximum(absmax, np.abs(chunk).max(axis=0), out=absmax)
+        scale = np.where(absmax > 0, absmax / 127, 1.0).astype(np.float32)
+
+        codes = np.empty(vectors.shape, dtype=np.int8)
+        for start in range(0, n, chunk_size):
+            chunk = normalize_rows(vectors[start : start + chunk_size])
+            codes[start : start + chunk_size] = np.clip(
+                np.rint(chunk / scale), -127, 127
+            )
+        return cls(codes, mode, scale)
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def coarse_scores(self, query, chunk_size=65536):
+        """Approximate similarity of one query to every row (higher is better)"""
+        query = normalize_rows(query)[0]
+        scores = np.empty(len(self), dtype=np.float32)
+        if self.mode == "binary":
+            bits = np.packbits(query > 0)
+            for start in range(0, len(self), chunk_size):
+                chunk = self.codes[start : start + chunk_size]
+                scores[start : start + chunk_size] = -popcount(chunk ^ bits)
+        else:
+            scaled_query = query * self.scale
+            for start in range(0, len(self), chunk_size):
+                chunk = self.codes[start : start + chunk_size].astype(np.float32)
+                scores[start : start + chunk_size] = chunk @ scaled_query
+        return scores
+
+    def search(self, query_embeddings, full_vectors=None, k=10, rerank=4):
+        """
+        Top-k (rows, scores) per query.
+
+        The k * rerank best coarse candidates are re-scored exactly against
+        full_vectors (only those rows are read); without full_vectors the
+        coarse ranking is returned as-is.
+        """
+        queries = normalize_rows(query_embeddings)
+        all_rows = np.full((queries.shape[0], k), -1, dtype=np.int64)
+        all_scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+
+        for i, query in enumerate(queries):
+            coarse = self.coarse_scores(query)
+            if full_vectors is None:
+                rows = top_k_indices(coarse, k)
+                scores = coarse[rows]
+            else:
+                # Sorted rows keep memmap reads close to sequential
+                candidates = np.sort(top_k_indices(coarse, k * rerank))
+                exact = normalize_rows(full_vectors[candidates]) @ query
+                best = top_k_indices(exact, k)
+                rows, scores = candidates[best], exact[best]
+            all_rows[i, : rows.size] = rows
+            all_scores[i, : rows.size] = scores
+
+        return all_rows, all_scores
+
+    def save(self, path):
+        """Persist codes (and scale) as .npy files in a directory"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / f"codes_{self.mode}.npy", self.codes)
+        if self.scale is not None:
+            np.save(path / f"scale_{self.mode}.npy", self.scale)
+
+    @classmethod
+    def load(cls, path, mode="int8", mmap=True):
+        """Open saved codes; returns None if none were saved for this mode"""
+        path = Path(path)
+        codes_path = path / f"codes_{mode}.npy"
+        if not codes_path.exists():
+            return None
+        codes = np.load(codes_path, mmap_mode="r" if mmap else None)
+        scale_path = path / f"scale_{mode}.npy"
+        scale = np.load(scale_path) if scale_path.exists() else None
+        return cls(codes, mode, scale)
+
+
+def evaluate_recall(index, full_vectors, queries, k=10, rerank=4):
+    """Recall@k of coarse-only and re-ranked search, plus memory footprint"""
+    exact_rows, _ = chunked_search(full_vectors, queries, k=k)
+    coarse_rows, _ = index.search(queries, k=k)
+    reranked_rows, _ = index.search(queries, full_vectors, k=k, rerank=rerank)
+
+    def recall(found):
+        hits = sum(len(set(a) & set(b)) for a, b in zip(found, exact_rows))
+        return hits / (len(queries) * k)
+
+    full_bytes = full_vectors.shape[0] * full_vectors.shape[1] * 4
+    return {
+        "mode": index.mode,
+        "coarse_recall": recall(coarse_rows),
+        "reranked_recall": recall(reranked_rows),
+        "code_bytes": index.nbytes,
+        "float32_bytes": full_bytes,
+        "compression": full_bytes / index.nbytes,
+    }
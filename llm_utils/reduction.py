@@ -0,0 +1,109 @@
+"""
+LLM Bootcamp OpenAI Demo - Dimension Reduction
+Reduced-dimension projections for stored embeddings and their recall cost
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from llm_utils.similarity import chunked_search, normalize_rows
+
+
+def supports_dimensions(model):
+    """Whether the embeddings API accepts a `dimensions` parameter for this model"""
+    return model.startswith("text-embedding-3")
+
+
+class Projection:
+    """
+    Maps full embeddings to n_components dimensions.
+
+    kind="truncate" keeps the leading dimensions and re-normalizes, which for
+    text-embedding-3 models matches requesting `dimensions=n_components` from
+    the API. kind="pca" projects onto principal components fitted locally,
+    for models such as text-embedding-ada-002 that cannot be shortened.
+    """
+
+    def __init__(self, kind, n_components, components=None):
+        self.kind = kind
+        self.n_components = n_components
+        self.components = components
+
+    @classmethod
+    def truncate(cls, n_components):
+        return cls("truncate", n_components)
+
+    @classmethod
+    def fit_pca(cls, vectors, n_components, chunk_size=65536):
+        """
+        Principal directions of the unit vectors, accumulated chunk by chunk.
+
+        The second-moment matrix is not mean-centred: embeddings share a large
+        common direction, and keeping it preserves the dot products that
+        cosine ranking depends on.
+        """
+        dim = vectors.shape[1]
+        gram = np.zeros((dim, dim), dtype=np.float64)
+        for start in range(0, vectors.shape[0], chunk_size):
+            chunk = normalize_rows(vectors[start : start + chunk_size])
+            gram += chunk.T.astype(np.float64) @ chunk
+
+        eigenvalues, eigenvectors = np.linalg.eigh(gram)
+        # eigh returns ascending eigenvalues; keep the largest
+        top = np.argsort(eigenvalues)[::-1][:n_components]
+        components = eigenvectors[:, top].T.astype(np.float32)
+        return cls("pca", n_components, components)
+
+    @classmethod
+    def for_model(cls, model, vectors, n_components):
+        """Truncation where the API supports it, a fitted PCA otherwise"""
+        if supports_dimensions(model):
+            return cls.truncate(n_components)
+        return cls.fit_pca(vectors, n_components)
+
+    def transform(self, embeddings):
+        """Float32 (n, n_components) reduced embeddings"""
+        if self.kind == "truncate":
+            return normalize_rows(np.asarray(embeddings)[..., : self.n_components])
+        return normalize_rows(embeddings) @ self.components.T
+
+    def transform_chunks(self, vectors, chunk_size=65536):
+        """Yield reduced embeddings chunk by chunk"""
+        for start in range(0, vectors.shape[0], chunk_size):
+            yield self.transform(vectors[start : start + chunk_size])
+
+    def save(self, path):
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "projection.json").write_text(
+            json.dumps({"kind": self.kind, "n_components": self.n_components})
+        )
+        if self.kind == "pca":
+            np.save(path / "projection_components.npy", self.components)
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        meta = json.loads((path / "projection.json").read_text())
+        if meta["kind"] == "truncate":
+            return cls.truncate(meta["n_components"])
+        return cls(
+            "pca", meta["n_components"], np.load(path / "projection_components.npy")
+        )
+
+
+def evaluate_reduction(full_vectors, reduced_vectors, queries, projection, k=10):
+    """Recall@k of reduced-dimension search relative to full-dimension search"""
+    exact_rows, _ = chunked_search(full_vectors, queries, k=k)
+    reduced_rows, _ = chunked_search(
+        reduced_vectors, projection.transform(queries), k=k
+    )
+    hits = sum(len(set(a) & set(b)) for a, b in zip(reduced_rows, exact_rows))
+    return {
+        "kind": projection.kind,
+        "dimensions": f"{full_vectors.shape[1]} -> {reduced_vectors.shape[1]}",
+        "recall": hits / (len(queries) * k),
+        "size_ratio": reduced_vectors.shape[1] / full_vectors.shape[1],
+    }
@@ -0,0 +1,177 @@
+"""
+LLM Bootcamp OpenAI Demo - Semantic Response Cache
+Answers a question from a previous answer when an earlier question in the
+same context is close enough in embedding space
+"""
+
+import hashlib
+import random
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from llm_utils.similarity import normalize_rows
+
+# Words that point back at earlier turns ("why?", "can you elaborate on that?")
+_CONTEXT_WORDS = re.compile(
+    r"\b(it|its|that|this|these|those|them|they|he|she|above|previous|"
+    r"earlier|again|elaborate|why|instead|else)\b",
+    re.IGNORECASE,
+)
+
+
+def depends_on_context(question, min_words=4):
+    """Heuristic: whether a question only makes sense after earlier turns"""
+    return len(question.split()) < min_words or bool(_CONTEXT_WORDS.search(question))
+
+
+class _ScopeEntries:
+    """Ring buffer of unit question vectors and their answers for one scope"""
+
+    def __init__(self, dim, capacity):
+        # Start small: most scopes only ever hold a few questions
+        self.vectors = np.zeros((min(capacity, 4), dim), dtype=np.float32)
+        self.answers = []
+        self.capacity = capacity
+        self.next = 0
+
+    def add(self, vector, answer):
+        if len(self.answers) < self.capacity:
+            if len(self.answers) == self.vectors.shape[0]:
+                # Grow geometrically up to capacity
+                grown = np.zeros(
+                    (
+                        min(self.capacity, 2 * self.vectors.shape[0]),
+                        self.vectors.shape[1],
+                    ),
+                    dtype=np.float32,
+                )
+                grown[: len(self.answers)] = self.vectors[: len(self.answers)]
+                self.vectors = grown
+            self.vectors[len(self.answers)] = vector
+            self.answers.append(answer)
+        else:
+            # Full: overwrite the oldest entry
+            self.vectors[self.next] = vector
+            self.answers[self.next] = answer
+            self.next = (self.next + 1) % self.capacity
+
+    def best(self, vector):
+        if not self.answers:
+            return None, -1.0
+        scores = self.vectors[: len(self.answers)] @ vector
+        row = int(np.argmax(scores))
+        return self.answers[row], float(scores[row])
+
+
+class SemanticCache:
+    """
+    Embedding-similarity cache for chat answers, scoped by system prompt.
+
+    `embed` maps a list of texts to a float32 matrix. A question whose cosine
+    similarity to a cached question reaches `threshold` gets that question's
+    answer; answers are never shared between different scopes. At most
+    `max_scopes` scopes are kept, dropping the least recently used. Callers
+    pass cacheable=False for questions that depend on earlier turns (see
+    depends_on_context), which skips the cache entirely.
+
+    The default threshold is a starting point, not a tuned value. To measure
+    it, a `verify_rate` fraction of hits also calls create() and compares the
+    fresh answer with the cached one; when their embeddings are at least
+    `answer_threshold` similar the hit counts as correct. stats() reports the
+    resulting hit precision next to the hit rate, and verified hits return
+    the fresh answer.
+    """
+
+    def __init__(
+        self,
+        embed,
+        threshold=0.92,
+        max_entries_per_scope=10_000,
+        max_scopes=256,
+        verify_rate=0.0,
+        answer_threshold=0.85,
+        seed=None,
+    ):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries_per_scope = max_entries_per_scope
+        self.max_scopes = max_scopes
+        self.verify_rate = verify_rate
+        self.answer_threshold = answer_threshold
+        self._random = random.Random(seed)
+        self._scopes = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.verified_hits = 0
+        self.correct_hits = 0
+
+    @staticmethod
+    def _scope_key(scope):
+        return hashlib.sha256(scope.encode("utf-8")).hexdigest()
+
+    def get_or_create(self, question, create, scope="", cacheable=True):
+        """
+        Cached answer for the question, or create() stored for next time.
+
+        Returns (answer, similarity) where similarity is None for a fresh answer.
+        With cacheable=False, create() is called without embedding or storing.
+        """
+        if not cacheable:
+            with self._lock:
+                self.bypassed += 1
+            return create(), None
+        vector = normalize_rows(self.embed([question]))[0]
+        key = self._scope_key(scope)
+        cached = None
+        with self._lock:
+            entries = self._scopes.get(key)
+            if entries is not None:
+                self._scopes.move_to_end(key)
+                answer, similarity = entries.best(vector)
+                if similarity >= self.threshold:
+                    self.hits += 1
+                    if self._random.random() >= self.verify_rate:
+                        return answer, similarity
+                    cached = answer
+            if cached is None:
+                self.misses += 1
+
+        answer = create()
+        if cached is not None:
+            answers = normalize_rows(self.embed([cached, answer]))
+            correct = float(answers[0] @ answers[1]) >= self.answer_threshold
+            with self._lock:
+                self.verified_hits += 1
+                self.correct_hits += correct
+            if correct:
+                return answer, None
+        with self._lock:
+            entries = self._scopes.get(key)
+            if entries is None:
+                entries = _ScopeEntries(vector.shape[0], self.max_entries_per_scope)
+                self._scopes[key] = entries
+                while len(self._scopes) > self.max_scopes:
+                    self._scopes.popitem(last=False)
+            entries.add(vector, answer)
+        return answer, None
+
+    def stats(self):
+        """Hit/miss counters and sampled hit precision for reporting"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bypassed": self.bypassed,
+            "verified_hits": self.verified_hits,
+            "hit_precision": (
+                self.correct_hits / self.verified_hits if self.verified_hits else None
+            ),
+            "entries": sum(len(entries.answers) for entries in self._scopes.values()),
+            "scopes": len(self._scopes),
+        }
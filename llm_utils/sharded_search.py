@@ -0,0 +1,220 @@
+"""
+LLM Bootcamp OpenAI Demo - Sharded Exhaustive Search
+Exact top-k over an EmbeddingStore split into row shards across a process pool
+
+Every worker memory-maps the same store files, so shards are shared through the
+OS page cache and only the query matrix is pickled per request.
+
+Run directly to measure throughput against worker count on synthetic data:
+    python -m llm_utils.sharded_search --vectors 1000000 --dim 256
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from threadpoolctl import threadpool_limits
+
+from llm_utils.embedding_store import EmbeddingStore
+from llm_utils.similarity import normalize_rows, top_k_indices
+
+# Per-process cache of opened stores: path -> (row count, vectors, inverse norms)
+_open_stores = {}
+
+
+def _limit_blas_threads():
+    """One BLAS thread per worker so processes don't oversubscribe the cores"""
+    threadpool_limits(1)
+
+
+def inverse_norms(store, chunk_size=65536):
+    """1 / ||row|| for every stored row, cached as inv_norms.npy in the store"""
+    path = store.path / "inv_norms.npy"
+    if path.exists():
+        norms = np.load(path, mmap_mode="r")
+        if norms.shape[0] == len(store):
+            return norms
+
+    norms = np.empty(len(store), dtype=np.float32)
+    vectors = store.vectors
+    for start in range(0, len(store), chunk_size):
+        chunk = np.asarray(vectors[start : start + chunk_size], dtype=np.float32)
+        chunk_norms = np.linalg.norm(chunk, axis=1)
+        chunk_norms[chunk_norms == 0] = 1.0
+        norms[start : start + chunk_size] = 1.0 / chunk_norms
+    np.save(path, norms)
+    return np.load(path, mmap_mode="r")
+
+
+def _open_store(path, count):
+    cached = _open_stores.get(path)
+    if cached is None or cached[0] != count:
+        store = EmbeddingStore(path)
+        cached = (
+            count,
+            store.vectors,
+            np.load(store.path / "inv_norms.npy", mmap_mode="r"),
+        )
+        _open_stores[path] = cached
+    return cached[1], cached[2]
+
+
+def _search_shard(path, count, start, end, queries, k, chunk_size):
+    """Local top-k of one row range; queries are already unit length"""
+    vectors, inv_norms = _open_store(path, count)
+    best_rows = np.empty((queries.shape[0], 0), dtype=np.int64)
+    best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+
+    for chunk_start in range(start, end, chunk_size):
+        chunk_end = min(chunk_start + chunk_size, end)
+        chunk = np.asarray(vectors[chunk_start:chunk_end], dtype=np.float32)
+        scores = (queries @ chunk.T) * inv_norms[chunk_start:chunk_end]
+        local = top_k_indices(scores, k)
+        rows = np.concatenate([best_rows, local + chunk_start], axis=1)
+        merged = np.concatenate(
+            [best_scores, np.take_along_axis(scores, local, axis=1)], axis=1
+        )
+        keep = top_k_indices(merged, k)
+        best_rows = np.take_along_axis(rows, keep, axis=1)
+        best_scores = np.take_along_axis(merged, keep, axis=1)
+
+    return best_rows, best_scores
+
+
+class ShardedSearcher:
+    """Exact cosine top-k with one shard of the store per worker process"""
+
+    def __init__(self, store_path, n_workers=None, chunk_size=65536):
+        self.store = EmbeddingStore(store_path)
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        inverse_norms(self.store, chunk_size)
+
+        n = len(self.store)
+        bounds = np.linspace(0, n, self.n_workers + 1).astype(np.int64)
+        self.shards = [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.n_workers, initializer=_limit_blas_threads
+        )
+
+    def search(self, query_embeddings, k=10):
+        """Top-k (ids, scores) per query, merged from every shard"""
+        queries = normalize_rows(query_embeddings)
+        if not self.shards:
+            # Empty store: no shard to search
+            empty = np.empty((queries.shape[0], 0), dtype=np.float32)
+            return [[] for _ in range(queries.shape[0])], empty
+        futures = [
+            self.pool.submit(
+                _search_shard,
+                str(self.store.path),
+                len(self.store),
+                start,
+                end,
+                queries,
+                k,
+                self.chunk_size,
+            )
+            for start, end in self.shards
+        ]
+        results = [future.result() for future in futures]
+
+        rows = np.concatenate([shard_rows for shard_rows, _ in results], axis=1)
+        scores = np.concatenate([shard_scores for _, shard_scores in results], axis=1)
+        keep = top_k_indices(scores, k)
+        rows = np.take_along_axis(rows, keep, axis=1)
+        scores = np.take_along_axis(scores, keep, axis=1)
+
+        ids = self.store.ids
+        return [[ids[row] for row in query_rows] for query_rows in rows], scores
+
+    def close(self):
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark_scaling(store_path, queries, k=10, worker_counts=None, batch_size=64):
+    """
+    Queries per second for each worker count, dispatching batch_size queries
+    at a time.
+
+    Every dispatch pays a fixed cost for IPC and a full pass over the shards,
+    so the first batch is also run one query per dispatch; overhead_ms is the
+    extra time per query that single-query dispatch costs.
+    """
+    worker_counts = worker_counts or sorted({1, 2, 4, os.cpu_count() or 1})
+    results = []
+    for n_workers in worker_counts:
+        with ShardedSearcher(store_path, n_workers=n_workers) as searcher:
+            searcher.search(queries[:1], k)  # warm up workers and page cache
+            start = time.perf_counter()
+            for i in range(0, len(queries), batch_size):
+                searcher.search(queries[i : i + batch_size], k)
+            elapsed = time.perf_counter() - start
+
+            single = queries[:batch_size]
+            start = time.perf_counter()
+            for i in range(len(single)):
+                searcher.search(single[i : i + 1], k)
+            single_elapsed = time.perf_counter() - start
+        results.append(
+            {
+                "workers": n_workers,
+                "qps": len(queries) / elapsed,
+                "single_qps": len(single) / single_elapsed,
+                "overhead_ms": 1000
+                * (single_elapsed / len(single) - elapsed / len(queries)),
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure sharded exact-search throughput against worker count"
+    )
+    parser.add_argument("--vectors", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=512)
+    parser.add_argument(
+        "--batch-size", type=int, default=64, help="Queries per dispatch (32-256)"
+    )
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EmbeddingStore(tmp)
+        for start in range(0, args.vectors, 100_000):
+            n = min(100_000, args.vectors - start)
+            store.append(
+                list(range(start, start + n)),
+                rng.standard_normal((n, args.dim), dtype=np.float32),
+            )
+        queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+        print(f"=== Sharded Search Benchmark ===")
+        print(
+            f"Vectors: {len(store)} x {args.dim} | Queries: {args.queries} "
+            f"| Batch: {args.batch_size}"
+        )
+        for row in benchmark_scaling(
+            tmp, queries, k=args.k, batch_size=args.batch_size
+        ):
+            print(
+                f"workers={row['workers']:>3} | {row['qps']:.1f} queries/s batched "
+                f"| {row['single_qps']:.1f} queries/s one at a time "
+                f"| overhead {row['overhead_ms']:.2f}ms/query"
+            )
+
+
+if __name__ == "__main__":
+    main()
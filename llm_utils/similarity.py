@@ -0,0 +1,99 @@
+"""
+LLM Bootcamp OpenAI Demo - Similarity Engine
+Vectorized cosine scoring and top-k selection over an embedding matrix
+"""
+
+import numpy as np
+
+
+def normalize_rows(embeddings):
+    """Return a contiguous float32 copy of embeddings with unit-length rows"""
+    matrix = np.array(embeddings, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    # Zero vectors stay zero instead of turning into NaNs
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return np.ascontiguousarray(matrix)
+
+
+def top_k_indices(scores, k):
+    """Indices of the k highest scores along the last axis, best first"""
+    scores = np.asarray(scores)
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+    # Only the k survivors are sorted
+    candidate_scores = np.take_along_axis(scores, candidates, axis=-1)
+    order = np.argsort(-candidate_scores, axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+def mean_pairwise_similarity(embeddings):
+    """
+    Average cosine similarity over all ordered pairs i != j.
+
+    With unit rows, sum_ij <x_i, x_j> = ||sum_i x_i||^2, so the full n x n
+    similarity matrix never has to be materialized.
+    """
+    matrix = normalize_rows(embeddings)
+    n = matrix.shape[0]
+    if n < 2:
+        return float("nan")
+    total = float(np.square(matrix.sum(axis=0, dtype=np.float64)).sum())
+    diagonal = float(np.square(matrix, dtype=np.float64).sum())
+    return (total - diagonal) / (n * (n - 1))
+
+
+class SimilarityEngine:
+    """Cosine scoring of queries against a fixed, pre-normalized document matrix"""
+
+    def __init__(self, embeddings):
+        self.matrix = normalize_rows(embeddings)
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def scores(self, query_embeddings):
+        """(n_queries, n_documents) cosine similarities from one matmul"""
+        queries = normalize_rows(query_embeddings)
+        return queries @ self.matrix.T
+
+    def search(self, query_embeddings, k=10):
+        """Top-k (indices, scores) per query, best first"""
+        scores = self.scores(query_embeddings)
+        indices = top_k_indices(scores, k)
+        return indices, np.take_along_axis(scores, indices, axis=-1)
+
+
+def chunked_search(matrix, query_embeddings, k=10, chunk_size=65536, row_mask=None):
+    """
+    Exact top-k over a large (possibly memory-mapped) matrix.
+
+    Rows are normalized one chunk at a time, so only chunk_size rows are ever
+    materialized in RAM. Rows where row_mask is False score -inf, so callers
+    should drop non-finite scores when fewer than k rows are live.
+    """
+    queries = normalize_rows(query_embeddings)
+    best_ids = np.empty((queries.shape[0], 0), dtype=np.int64)
+    best_scores = np.empty((queries.shape[0], 0), dtype=np.float32)
+
+    for start in range(0, matrix.shape[0], chunk_size):
+        chunk = normalize_rows(matrix[start : start + chunk_size])
+        scores = queries @ chunk.T
+        if row_mask is not None:
+            scores[:, ~row_mask[start : start + chunk_size]] = -np.inf
+        local = top_k_indices(scores, k)
+        merged_ids = np.concatenate([best_ids, local + start], axis=1)
+        merged_scores = np.concatenate(
+            [best_scores, np.take_along_axis(scores, local, axis=1)], axis=1
+        )
+        keep = top_k_indices(merged_scores, k)
+        best_ids = np.take_along_axis(merged_ids, keep, axis=1)
+        best_scores = np.take_along_axis(merged_scores, keep, axis=1)
+
+    return best_ids, best_scores
@@ -0,0 +1,98 @@
+"""
+LLM Bootcamp OpenAI Demo - Stream Consumer
+Collects streamed chat completion deltas in a list (joined once at the end)
+and fans each delta out to pluggable sinks with coalesced writes
+"""
+
+import json
+import sys
+import time
+
+
+def chunk_text(chunk):
+    """Content delta of a chat completion chunk, or None"""
+    if chunk.choices and chunk.choices[0].delta.content:
+        return chunk.choices[0].delta.content
+    return None
+
+
+class BufferedSink:
+    """
+    Writes deltas to a file-like object, coalescing them into one write (and
+    flush) per `min_interval` seconds or `min_chars` characters.
+
+    The first delta is written immediately so time-to-first-token stays
+    visible.
+    """
+
+    def __init__(self, file, min_interval=0.05, min_chars=256):
+        self.file = file
+        self.min_interval = min_interval
+        self.min_chars = min_chars
+        self._buffer = []
+        self._size = 0
+        self._last_flush = 0.0
+
+    def write(self, delta):
+        self._buffer.append(delta)
+        self._size += len(delta)
+        if (
+            self._size >= self.min_chars
+            or time.monotonic() - self._last_flush >= self.min_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self.file.write("".join(self._buffer))
+            self.file.flush()
+            self._buffer.clear()
+            self._size = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+
+class TerminalSink(BufferedSink):
+    def __init__(self, min_interval=0.05, min_chars=256):
+        super().__init__(sys.stdout, min_interval, min_chars)
+
+
+class SSESink(BufferedSink):
+    """
+    Sends coalesced deltas as server-sent events through `send(bytes)`, e.g.
+    an asyncio StreamWriter's write. `sent` counts the events sent, so an
+    async caller only needs to drain after a write that sent one.
+    """
+
+    def __init__(self, send, min_interval=0.05, min_chars=256):
+        super().__init__(None, min_interval, min_chars)
+        self.send = send
+        self.sent = 0
+
+    def flush(self):
+        if self._buffer:
+            delta = json.dumps({"delta": "".join(self._buffer)})
+            self.send(f"data: {delta}\n\n".encode("utf-8"))
+            self.sent += 1
+            self._buffer.clear()
+            self._size = 0
+        self._last_flush = time.monotonic()
+
+
+def consume_stream(stream, sinks=()):
+    """Drain a chat completion stream into the sinks; returns the full reply"""
+    parts = []
+    try:
+        for chunk in stream:
+            delta = chunk_text(chunk)
+            if delta is None:
+                continue
+            parts.append(delta)
+            for sink in sinks:
+                sink.write(delta)
+    finally:
+        for sink in sinks:
+            sink.close()
+    return "".join(parts)